@@ -0,0 +1,39 @@
+"""atletas_filter_indexes
+
+Revision ID: 3d6a8b1f0c52
+Revises: 7b3f9d2e6a14
+Create Date: 2026-10-18 15:10:44.302871
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3d6a8b1f0c52'
+down_revision = '7b3f9d2e6a14'
+branch_labels = None
+depends_on = None
+
+# Ordenações de GET /atletas?order_by= (a de created_at já existe em 7b3f9d2e6a14) e
+# filtros por igualdade seguidos da faixa de idade: categoria_id/centro_treinamento_id
+# e sexo por igualdade, idade_min/idade_max como intervalo na última coluna.
+INDICES = {
+    'ix_atletas_nome_pk_id': ['nome', 'pk_id'],
+    'ix_atletas_idade_pk_id': ['idade', 'pk_id'],
+    'ix_atletas_sexo_idade': ['sexo', 'idade'],
+    'ix_atletas_categoria_id_sexo_idade': ['categoria_id', 'sexo', 'idade'],
+    'ix_atletas_centro_treinamento_id_sexo_idade': ['centro_treinamento_id', 'sexo', 'idade'],
+}
+
+
+def upgrade() -> None:
+    # Mesmo cuidado de 7b3f9d2e6a14: CONCURRENTLY fora de transação
+    with op.get_context().autocommit_block():
+        for nome, colunas in INDICES.items():
+            op.create_index(nome, 'atletas', colunas, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nome in INDICES:
+            op.drop_index(nome, table_name='atletas', postgresql_concurrently=True)
@@ -0,0 +1,50 @@
+"""trigram_nome_indexes
+
+Revision ID: 4b7e2f91a0c3
+Revises: c006e8463eb4
+Create Date: 2026-10-18 09:12:40.318211
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2f91a0c3'
+down_revision = 'c006e8463eb4'
+branch_labels = None
+depends_on = None
+
+TABELAS = ('atletas', 'categorias', 'centros_treinamento')
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    # unaccent() é STABLE; índices de expressão exigem uma função IMMUTABLE
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        """
+    )
+    # Como em 7b3f9d2e6a14: CONCURRENTLY não bloqueia escritas durante a construção
+    # do GIN, mas não roda dentro de transação. Se a criação falhar, o índice fica
+    # INVALID: remova-o e rode a migração de novo.
+    with op.get_context().autocommit_block():
+        for tabela in TABELAS:
+            op.create_index(
+                f'ix_{tabela}_nome_trgm',
+                tabela,
+                [sa.text('immutable_unaccent(lower(nome)) gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for tabela in TABELAS:
+            op.drop_index(f'ix_{tabela}_nome_trgm', table_name=tabela, postgresql_concurrently=True)
+    op.execute('DROP FUNCTION IF EXISTS immutable_unaccent(text)')
@@ -0,0 +1,133 @@
+"""atletas_stats
+
+Revision ID: 5e8a1c2d7f43
+Revises: 9c1d5e7a3b28
+Create Date: 2026-10-18 13:05:27.114520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a1c2d7f43'
+down_revision = '9c1d5e7a3b28'
+branch_labels = None
+depends_on = None
+
+# Uma linha por (escopo, id, sexo): total geral, por categoria e por centro de treinamento
+AGREGADO = """
+    SELECT CASE
+               WHEN GROUPING(categoria_id) = 0 THEN 'categoria'
+               WHEN GROUPING(centro_treinamento_id) = 0 THEN 'centro_treinamento'
+               ELSE 'total'
+           END AS escopo,
+           COALESCE(categoria_id, centro_treinamento_id, 0) AS ref_id,
+           sexo,
+           count(*) AS quantidade,
+           sum(idade) AS soma_idade,
+           sum(peso) AS soma_peso,
+           sum(altura) AS soma_altura,
+           timezone('utc', now()) AS atualizado_em
+    FROM atletas
+    GROUP BY GROUPING SETS ((categoria_id, sexo), (centro_treinamento_id, sexo), (sexo))
+"""
+
+# Soma (sinal +1) ou subtrai (-1) as linhas de uma transition table nos totais
+APLICAR = """
+        INSERT INTO atletas_stats AS s
+            (escopo, ref_id, sexo, quantidade, soma_idade, soma_peso, soma_altura, atualizado_em)
+        SELECT d.escopo, d.ref_id, t.sexo, {sinal} * count(*), {sinal} * sum(t.idade),
+               {sinal} * sum(t.peso), {sinal} * sum(t.altura), timezone('utc', now())
+        FROM {tabela} AS t,
+             LATERAL (VALUES ('total', 0), ('categoria', t.categoria_id),
+                             ('centro_treinamento', t.centro_treinamento_id)) AS d (escopo, ref_id)
+        GROUP BY d.escopo, d.ref_id, t.sexo
+        ORDER BY d.escopo, d.ref_id, t.sexo
+        ON CONFLICT (escopo, ref_id, sexo) DO UPDATE SET
+            quantidade = s.quantidade + EXCLUDED.quantidade,
+            soma_idade = s.soma_idade + EXCLUDED.soma_idade,
+            soma_peso = s.soma_peso + EXCLUDED.soma_peso,
+            soma_altura = s.soma_altura + EXCLUDED.soma_altura,
+            atualizado_em = EXCLUDED.atualizado_em;
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'atletas_stats',
+        sa.Column('escopo', sa.String(20), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=False),
+        sa.Column('sexo', sa.String(1), nullable=False),
+        sa.Column('quantidade', sa.BigInteger(), nullable=False),
+        sa.Column('soma_idade', sa.BigInteger(), nullable=False),
+        sa.Column('soma_peso', sa.Float(), nullable=False),
+        sa.Column('soma_altura', sa.Float(), nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('escopo', 'ref_id', 'sexo'),
+    )
+
+    op.execute(f'CREATE MATERIALIZED VIEW atletas_stats_mv AS {AGREGADO}')
+    # Índice único: exigido pelo REFRESH ... CONCURRENTLY
+    op.create_index('ix_atletas_stats_mv', 'atletas_stats_mv', ['escopo', 'ref_id', 'sexo'], unique=True)
+
+    # Triggers por comando (transition tables): uma importação em lote vira um
+    # upsert por grupo, não um por atleta. No modo materialized a aplicação envia
+    # workout.stats_mode=materialized e os triggers não fazem nada.
+    op.execute(
+        f"""
+        CREATE FUNCTION atletas_stats_trigger() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF current_setting('workout.stats_mode', true) = 'materialized' THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {APLICAR.format(sinal=-1, tabela='antigos')}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {APLICAR.format(sinal=1, tabela='novos')}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        'CREATE TRIGGER atletas_stats_insert AFTER INSERT ON atletas '
+        'REFERENCING NEW TABLE AS novos FOR EACH STATEMENT EXECUTE FUNCTION atletas_stats_trigger()'
+    )
+    op.execute(
+        'CREATE TRIGGER atletas_stats_update AFTER UPDATE ON atletas '
+        'REFERENCING OLD TABLE AS antigos NEW TABLE AS novos '
+        'FOR EACH STATEMENT EXECUTE FUNCTION atletas_stats_trigger()'
+    )
+    op.execute(
+        'CREATE TRIGGER atletas_stats_delete AFTER DELETE ON atletas '
+        'REFERENCING OLD TABLE AS antigos FOR EACH STATEMENT EXECUTE FUNCTION atletas_stats_trigger()'
+    )
+
+    # Recalcula a tabela do zero (carga inicial e volta ao modo incremental)
+    op.execute(
+        f"""
+        CREATE FUNCTION atletas_stats_rebuild() RETURNS void
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            LOCK TABLE atletas IN SHARE MODE;
+            DELETE FROM atletas_stats;
+            INSERT INTO atletas_stats {AGREGADO};
+        END
+        $$
+        """
+    )
+    op.execute('SELECT atletas_stats_rebuild()')
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER atletas_stats_delete ON atletas')
+    op.execute('DROP TRIGGER atletas_stats_update ON atletas')
+    op.execute('DROP TRIGGER atletas_stats_insert ON atletas')
+    op.execute('DROP FUNCTION atletas_stats_rebuild()')
+    op.execute('DROP FUNCTION atletas_stats_trigger()')
+    op.execute('DROP MATERIALIZED VIEW atletas_stats_mv')
+    op.drop_table('atletas_stats')
@@ -0,0 +1,37 @@
+"""atletas_fk_sort_indexes
+
+Revision ID: 7b3f9d2e6a14
+Revises: 5e8a1c2d7f43
+Create Date: 2026-10-18 14:22:09.870113
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3f9d2e6a14'
+down_revision = '5e8a1c2d7f43'
+branch_labels = None
+depends_on = None
+
+# (categoria_id, pk_id) atende a FK (carga de CategoriaModel.atletas, checagem no
+# DELETE de categorias) e a listagem de uma categoria já ordenada por pk_id.
+INDICES = {
+    'ix_atletas_categoria_id_pk_id': ['categoria_id', 'pk_id'],
+    'ix_atletas_centro_treinamento_id_pk_id': ['centro_treinamento_id', 'pk_id'],
+    'ix_atletas_created_at_pk_id': ['created_at', 'pk_id'],
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY não bloqueia escritas em atletas, mas não roda dentro de transação.
+    # Se a criação falhar, o índice fica INVALID: remova-o e rode a migração de novo.
+    with op.get_context().autocommit_block():
+        for nome, colunas in INDICES.items():
+            op.create_index(nome, 'atletas', colunas, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nome in INDICES:
+            op.drop_index(nome, table_name='atletas', postgresql_concurrently=True)
@@ -0,0 +1,36 @@
+"""idempotency_keys
+
+Revision ID: 8f2c4a6e1b97
+Revises: 3d6a8b1f0c52
+Create Date: 2026-10-18 16:02:51.448306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2c4a6e1b97'
+down_revision = '3d6a8b1f0c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # status_code/body nulos: chave reservada, requisição ainda em andamento
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(255), nullable=False),
+        sa.Column('request_hash', sa.String(64), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('body', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_idempotency_keys_expires_at', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,33 @@
+"""atletas_updated_at
+
+Revision ID: 9c1d5e7a3b28
+Revises: 4b7e2f91a0c3
+Create Date: 2026-10-18 10:41:03.552907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1d5e7a3b28'
+down_revision = '4b7e2f91a0c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Default não volátil: no PostgreSQL 11+ a coluna é adicionada sem reescrever a tabela
+    op.add_column(
+        'atletas',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())")
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('atletas', 'updated_at')
@@ -0,0 +1,195 @@
+"""atletas_partitioning
+
+Revision ID: a1f3c7e9d2b4
+Revises: 8f2c4a6e1b97
+Create Date: 2026-10-18 18:21:09.734015
+
+"""
+from typing import Dict, List
+
+from alembic import op
+import sqlalchemy as sa
+
+from workout_api.configs.settings import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1f3c7e9d2b4'
+down_revision = '8f2c4a6e1b97'
+branch_labels = None
+depends_on = None
+
+# ATLETAS_PARTITIONING define o particionamento aplicado; com 'none' a revisão não
+# altera nada. A tabela é recriada e os dados copiados: rode em janela de manutenção.
+CHAVES = {'created_at': 'RANGE (created_at)', 'centro_treinamento': 'HASH (centro_treinamento_id)'}
+COLUNAS = {'created_at': 'created_at', 'centro_treinamento': 'centro_treinamento_id'}
+
+# Partições mensais [inicio, fim), criadas só se ainda não existirem
+CRIAR_PARTICOES = """
+    CREATE FUNCTION atletas_criar_particoes(inicio date, fim date) RETURNS integer
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        mes date := date_trunc('month', inicio);
+        nome text;
+        criadas integer := 0;
+    BEGIN
+        WHILE mes < fim LOOP
+            nome := 'atletas_p' || to_char(mes, 'YYYYMM');
+            IF to_regclass(nome) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF atletas FOR VALUES FROM (%L) TO (%L)',
+                    nome, mes, (mes + interval '1 month')::date
+                );
+                criadas := criadas + 1;
+            END IF;
+            mes := (mes + interval '1 month')::date;
+        END LOOP;
+        RETURN criadas;
+    END
+    $$
+"""
+
+# Índice único em cpf exige a chave de partição; a unicidade global fica nesta tabela,
+# mantida por triggers por comando como os de atletas_stats
+CPFS_TRIGGER = """
+    CREATE FUNCTION atletas_cpfs_trigger() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO atletas_cpfs (cpf, pk_id) SELECT cpf, pk_id FROM novos;
+        ELSIF TG_OP = 'DELETE' THEN
+            DELETE FROM atletas_cpfs AS c USING antigos AS a WHERE c.cpf = a.cpf;
+        ELSE
+            -- Transition tables não aceitam UPDATE OF cpf: filtra aqui as linhas com cpf alterado
+            DELETE FROM atletas_cpfs AS c USING antigos AS a, novos AS n
+                WHERE n.pk_id = a.pk_id AND n.cpf <> a.cpf AND c.cpf = a.cpf;
+            INSERT INTO atletas_cpfs (cpf, pk_id)
+                SELECT n.cpf, n.pk_id FROM novos AS n JOIN antigos AS a USING (pk_id) WHERE n.cpf <> a.cpf;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+CPFS_TRIGGERS = [
+    'CREATE TRIGGER atletas_cpfs_insert AFTER INSERT ON atletas '
+    'REFERENCING NEW TABLE AS novos FOR EACH STATEMENT EXECUTE FUNCTION atletas_cpfs_trigger()',
+    'CREATE TRIGGER atletas_cpfs_update AFTER UPDATE ON atletas '
+    'REFERENCING OLD TABLE AS antigos NEW TABLE AS novos FOR EACH STATEMENT EXECUTE FUNCTION atletas_cpfs_trigger()',
+    'CREATE TRIGGER atletas_cpfs_delete AFTER DELETE ON atletas '
+    'REFERENCING OLD TABLE AS antigos FOR EACH STATEMENT EXECUTE FUNCTION atletas_cpfs_trigger()',
+]
+
+
+def _linhas(sql: str) -> List[str]:
+    return [linha for linha, in op.get_bind().execute(sa.text(sql))]
+
+
+def _dependentes() -> Dict[str, List[str]]:
+    """DDL dos objetos ligados a atletas que precisam ser recriados na tabela nova."""
+    return {
+        # Índices das constraints (PK, cpf) são recriados à parte
+        'indices': [
+            definicao.replace(' ON ONLY ', ' ON ')
+            for definicao in _linhas(
+                "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'atletas' "
+                "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = 'atletas'::regclass)"
+            )
+        ],
+        'fks': _linhas(
+            "SELECT format('ALTER TABLE atletas ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid)) "
+            "FROM pg_constraint WHERE conrelid = 'atletas'::regclass AND contype = 'f'"
+        ),
+        'triggers': _linhas(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = 'atletas'::regclass "
+            "AND NOT tgisinternal AND tgname NOT LIKE 'atletas_cpfs_%'"
+        ),
+        'mv': _linhas("SELECT pg_get_viewdef('atletas_stats_mv'::regclass)"),
+        'mv_indices': _linhas(
+            "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'atletas_stats_mv'"
+        ),
+    }
+
+
+def _recriar(particionamento: str) -> Dict[str, List[str]]:
+    """Troca atletas por uma tabela nova com as mesmas colunas e os mesmos dados.
+
+    Devolve os dependentes capturados, a recriar depois das constraints da tabela nova.
+    """
+    dependentes = _dependentes()
+    op.execute('DROP MATERIALIZED VIEW atletas_stats_mv')
+    op.execute('ALTER TABLE atletas RENAME TO atletas_legado')
+    op.execute(f'CREATE TABLE atletas (LIKE atletas_legado INCLUDING DEFAULTS) {particionamento}')
+    return dependentes
+
+
+def _copiar() -> None:
+    op.execute('INSERT INTO atletas SELECT * FROM atletas_legado')
+    op.execute('ALTER SEQUENCE atletas_pk_id_seq OWNED BY atletas.pk_id')
+    op.execute('DROP TABLE atletas_legado')
+
+
+def _restaurar(dependentes: Dict[str, List[str]]) -> None:
+    for comando in (*dependentes['fks'], *dependentes['indices'], *dependentes['triggers']):
+        op.execute(comando)
+    op.execute(f"CREATE MATERIALIZED VIEW atletas_stats_mv AS {dependentes['mv'][0]}")
+    for comando in dependentes['mv_indices']:
+        op.execute(comando)
+    op.execute('ANALYZE atletas')
+
+
+def upgrade() -> None:
+    modo = settings.ATLETAS_PARTITIONING
+    if modo == 'none':
+        return
+
+    dependentes = _recriar(f'PARTITION BY {CHAVES[modo]}')
+    if modo == 'created_at':
+        op.execute(CRIAR_PARTICOES)
+        # Fora dos meses criados (datas antigas ou muito à frente) as linhas vão para a default
+        op.execute('CREATE TABLE atletas_default PARTITION OF atletas DEFAULT')
+        op.execute(
+            f"""
+            SELECT atletas_criar_particoes(
+                least(CAST(min(created_at) AS date), CAST(timezone('utc', now()) AS date)),
+                CAST(timezone('utc', now()) + interval '{settings.ATLETAS_PARTITIONS_AHEAD + 1} months' AS date)
+            )
+            FROM atletas_legado
+            """
+        )
+    else:
+        n = settings.ATLETAS_HASH_PARTITIONS
+        for resto in range(n):
+            op.execute(f'CREATE TABLE atletas_h{resto} PARTITION OF atletas FOR VALUES WITH (MODULUS {n}, REMAINDER {resto})')
+    _copiar()
+
+    op.execute(f'ALTER TABLE atletas ADD CONSTRAINT atletas_pkey PRIMARY KEY (pk_id, {COLUNAS[modo]})')
+    op.create_table(
+        'atletas_cpfs',
+        sa.Column('cpf', sa.String(11), nullable=False),
+        sa.Column('pk_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('cpf', name='atletas_cpfs_pkey'),
+    )
+    op.execute('INSERT INTO atletas_cpfs (cpf, pk_id) SELECT cpf, pk_id FROM atletas')
+    op.execute(CPFS_TRIGGER)
+    for comando in CPFS_TRIGGERS:
+        op.execute(comando)
+    _restaurar(dependentes)
+
+
+def downgrade() -> None:
+    particionada = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM pg_partitioned_table WHERE partrelid = 'atletas'::regclass"
+    )).scalar()
+    if not particionada:
+        return
+
+    # Partições já arquivadas (desanexadas) não voltam para atletas
+    dependentes = _recriar('')
+    _copiar()
+    op.execute('DROP FUNCTION IF EXISTS atletas_criar_particoes(date, date)')
+    op.drop_table('atletas_cpfs')
+    op.execute('DROP FUNCTION atletas_cpfs_trigger()')
+
+    op.execute('ALTER TABLE atletas ADD CONSTRAINT atletas_pkey PRIMARY KEY (pk_id)')
+    op.execute('ALTER TABLE atletas ADD CONSTRAINT atletas_cpf_key UNIQUE (cpf)')
+    _restaurar(dependentes)
@@ -0,0 +1,43 @@
+"""atletas_stats_truncate
+
+Revision ID: b6e2d8f4c1a7
+Revises: a1f3c7e9d2b4
+Create Date: 2026-10-18 20:14:36.502118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2d8f4c1a7'
+down_revision = 'a1f3c7e9d2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # TRUNCATE não passa pelos triggers de INSERT/UPDATE/DELETE da 5e8a1c2d7f43:
+    # sem este, os totais antigos sobreviveriam ao `benchmarks.seed --reset`
+    op.execute(
+        """
+        CREATE FUNCTION atletas_stats_truncate() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM atletas_stats;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        'CREATE TRIGGER atletas_stats_truncate AFTER TRUNCATE ON atletas '
+        'FOR EACH STATEMENT EXECUTE FUNCTION atletas_stats_truncate()'
+    )
+    # Bancos que já passaram por um TRUNCATE estão com totais a mais
+    op.execute('SELECT atletas_stats_rebuild()')
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER atletas_stats_truncate ON atletas')
+    op.execute('DROP FUNCTION atletas_stats_truncate()')
@@ -0,0 +1,112 @@
+"""atletas_stats_drop_total
+
+Revision ID: d4c7a2e9f0b3
+Revises: b6e2d8f4c1a7
+Create Date: 2026-10-18 22:41:09.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4c7a2e9f0b3'
+down_revision = 'b6e2d8f4c1a7'
+branch_labels = None
+depends_on = None
+
+# O escopo 'total' da 5e8a1c2d7f43 tem só duas linhas, ('total', 0, sexo), e toda
+# escrita em atletas fazia upsert nelas: escritas concorrentes em categorias e
+# centros diferentes esperavam umas pelas outras no lock dessas linhas. Sem ele, o
+# total é a soma das linhas por categoria, feita na leitura (atleta/stats.py).
+ESCOPOS = {
+    'categoria': 'categoria_id',
+    'centro_treinamento': 'centro_treinamento_id',
+}
+
+
+def _agregado(total: bool) -> str:
+    return f"""
+    SELECT CASE
+               WHEN GROUPING(categoria_id) = 0 THEN 'categoria'
+               WHEN GROUPING(centro_treinamento_id) = 0 THEN 'centro_treinamento'
+               ELSE 'total'
+           END AS escopo,
+           COALESCE(categoria_id, centro_treinamento_id, 0) AS ref_id,
+           sexo,
+           count(*) AS quantidade,
+           sum(idade) AS soma_idade,
+           sum(peso) AS soma_peso,
+           sum(altura) AS soma_altura,
+           timezone('utc', now()) AS atualizado_em
+    FROM atletas
+    GROUP BY GROUPING SETS ((categoria_id, sexo), (centro_treinamento_id, sexo){', (sexo)' if total else ''})
+    """
+
+
+def _aplicar(sinal: int, tabela: str, total: bool) -> str:
+    escopos = [f"('{escopo}', t.{coluna})" for escopo, coluna in ESCOPOS.items()]
+    if total:
+        escopos.insert(0, "('total', 0)")
+    return f"""
+            INSERT INTO atletas_stats AS s
+                (escopo, ref_id, sexo, quantidade, soma_idade, soma_peso, soma_altura, atualizado_em)
+            SELECT d.escopo, d.ref_id, t.sexo, {sinal} * count(*), {sinal} * sum(t.idade),
+                   {sinal} * sum(t.peso), {sinal} * sum(t.altura), timezone('utc', now())
+            FROM {tabela} AS t,
+                 LATERAL (VALUES {', '.join(escopos)}) AS d (escopo, ref_id)
+            GROUP BY d.escopo, d.ref_id, t.sexo
+            ORDER BY d.escopo, d.ref_id, t.sexo
+            ON CONFLICT (escopo, ref_id, sexo) DO UPDATE SET
+                quantidade = s.quantidade + EXCLUDED.quantidade,
+                soma_idade = s.soma_idade + EXCLUDED.soma_idade,
+                soma_peso = s.soma_peso + EXCLUDED.soma_peso,
+                soma_altura = s.soma_altura + EXCLUDED.soma_altura,
+                atualizado_em = EXCLUDED.atualizado_em;
+    """
+
+
+def _recriar(total: bool) -> None:
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION atletas_stats_trigger() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF current_setting('workout.stats_mode', true) = 'materialized' THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {_aplicar(-1, 'antigos', total)}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {_aplicar(1, 'novos', total)}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION atletas_stats_rebuild() RETURNS void
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            LOCK TABLE atletas IN SHARE MODE;
+            DELETE FROM atletas_stats;
+            INSERT INTO atletas_stats {_agregado(total)};
+        END
+        $$
+        """
+    )
+    op.execute('DROP MATERIALIZED VIEW atletas_stats_mv')
+    op.execute(f'CREATE MATERIALIZED VIEW atletas_stats_mv AS {_agregado(total)}')
+    op.create_index('ix_atletas_stats_mv', 'atletas_stats_mv', ['escopo', 'ref_id', 'sexo'], unique=True)
+    op.execute('SELECT atletas_stats_rebuild()')
+
+
+def upgrade() -> None:
+    _recriar(total=False)
+
+
+def downgrade() -> None:
+    _recriar(total=True)
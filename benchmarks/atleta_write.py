@@ -0,0 +1,121 @@
+"""Compara as idas ao banco por criação de atleta: fluxo antigo x INSERT ... RETURNING.
+
+Uso (com o PostgreSQL do docker-compose e as migrações aplicadas):
+
+    PYTHONPATH=. python -m benchmarks.atleta_write --n 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import selectinload
+
+from workout_api.atleta.controller import create_atleta
+from workout_api.atleta.models import AtletaModel
+from workout_api.atleta.schemas import AtletaIn, AtletaOut
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+from workout_api.configs.database import async_session, engine
+
+CPF_PREFIXO = '9'
+
+
+class RoundTrips:
+    """Conta comandos, BEGIN e COMMIT/ROLLBACK enviados ao servidor."""
+
+    def __init__(self):
+        self.total = 0
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, 'before_cursor_execute', self._statement)
+        for nome in ('begin', 'commit', 'rollback'):
+            event.listen(sync_engine, nome, self._transaction)
+
+    def _statement(self, *args):
+        self.total += 1
+
+    def _transaction(self, conn):
+        if conn.get_execution_options().get('isolation_level') != 'AUTOCOMMIT':
+            self.total += 1
+
+
+async def legacy_create(atleta_in: AtletaIn) -> AtletaOut:
+    """Reprodução do fluxo anterior: 2 SELECTs de existência, INSERT, COMMIT e recarga."""
+    async with async_session() as db_session:
+        for model, pk_id in (
+            (CategoriaModel, atleta_in.categoria_id),
+            (CentroTreinamentoModel, atleta_in.centro_treinamento_id),
+        ):
+            if not (await db_session.execute(select(model).filter_by(pk_id=pk_id))).scalars().first():
+                raise RuntimeError(f'{model.__name__} {pk_id} não encontrado')
+
+        atleta = AtletaModel(**atleta_in.model_dump())
+        db_session.add(atleta)
+        await db_session.commit()
+        atleta = (await db_session.execute(
+            select(AtletaModel)
+            .options(selectinload(AtletaModel.categoria), selectinload(AtletaModel.centro_treinamento))
+            .filter_by(pk_id=atleta.pk_id)
+            .execution_options(populate_existing=True))
+        ).scalars().one()
+        return AtletaOut.model_validate(atleta)
+
+
+async def returning_create(atleta_in: AtletaIn) -> AtletaOut:
+    async with async_session() as db_session:
+        return await create_atleta(atleta_in, db_session)
+
+
+async def _fixtures() -> tuple[int, int]:
+    async with async_session() as db_session:
+        categoria = CategoriaModel(nome=f'bench-{uuid4().hex[:8]}')
+        centro = CentroTreinamentoModel(nome=f'bench-{uuid4().hex[:8]}', endereco='bench', proprietario='bench')
+        db_session.add_all([categoria, centro])
+        await db_session.commit()
+        return categoria.pk_id, centro.pk_id
+
+
+async def _cleanup(categoria_id: int, centro_id: int) -> None:
+    async with async_session() as db_session:
+        await db_session.execute(delete(AtletaModel).where(AtletaModel.categoria_id == categoria_id))
+        await db_session.execute(delete(CategoriaModel).where(CategoriaModel.pk_id == categoria_id))
+        await db_session.execute(delete(CentroTreinamentoModel).where(CentroTreinamentoModel.pk_id == centro_id))
+        await db_session.commit()
+
+
+async def main(n: int) -> None:
+    categoria_id, centro_id = await _fixtures()
+    round_trips = RoundTrips()
+    sequencia = 0
+
+    try:
+        for nome, criar in (('select+insert+refresh', legacy_create), ('insert...returning', returning_create)):
+            latencias = []
+            inicio_round_trips = round_trips.total
+            for _ in range(n):
+                sequencia += 1
+                atleta_in = AtletaIn(
+                    nome='Bench', cpf=f'{CPF_PREFIXO}{sequencia:010d}', idade=30, peso=80.0,
+                    altura=1.80, sexo='M', categoria_id=categoria_id, centro_treinamento_id=centro_id
+                )
+                inicio = time.perf_counter()
+                await criar(atleta_in)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+            latencias.sort()
+            print(
+                f'{nome:<24} round trips/criação: {(round_trips.total - inicio_round_trips) / n:5.2f}  '
+                f'p50: {statistics.median(latencias):7.2f} ms  '
+                f'p95: {latencias[int(len(latencias) * 0.95) - 1]:7.2f} ms'
+            )
+    finally:
+        await _cleanup(categoria_id, centro_id)
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=200, help='criações por variante')
+    asyncio.run(main(parser.parse_args().n))
@@ -0,0 +1,48 @@
+"""Compara dois resultados de `benchmarks.load` cenário a cenário.
+
+Uso:
+
+    PYTHONPATH=. python -m benchmarks.compare antes.json depois.json
+"""
+import argparse
+import json
+from typing import Any, Dict
+
+METRICAS = (
+    ('p50_ms', 'p50'),
+    ('p95_ms', 'p95'),
+    ('p99_ms', 'p99'),
+    ('throughput_rps', 'req/s'),
+    ('sql_por_requisicao', 'SQL/req'),
+)
+
+
+def _variacao(antes: float, depois: float) -> str:
+    if not antes:
+        return '     n/d'
+    return f'{(depois - antes) / antes * 100:+7.1f}%'
+
+
+def comparar(antes: Dict[str, Any], depois: Dict[str, Any]) -> None:
+    """Imprime, para cada cenário presente nos dois resultados, os valores e a variação."""
+    print(f"{'cenário':<32}" + ''.join(f'{titulo:>26}' for _, titulo in METRICAS))
+    for nome, atual in depois['cenarios'].items():
+        anterior = antes['cenarios'].get(nome)
+        if anterior is None:
+            print(f'{nome:<32} (novo)')
+            continue
+        print(f'{nome:<32}' + ''.join(
+            f'{anterior[chave]:>8.2f} → {atual[chave]:>7.2f} {_variacao(anterior[chave], atual[chave])}'
+            for chave, _ in METRICAS
+        ))
+    for nome in antes['cenarios'].keys() - depois['cenarios'].keys():
+        print(f'{nome:<32} (removido)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('antes')
+    parser.add_argument('depois')
+    args = parser.parse_args()
+    with open(args.antes) as antes, open(args.depois) as depois:
+        comparar(json.load(antes), json.load(depois))
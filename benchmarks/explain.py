@@ -0,0 +1,151 @@
+"""Verifica os planos das consultas geradas pelos controllers contra o banco de benchmark.
+
+Uso (depois de `python -m benchmarks.seed --reset`):
+
+    PYTHONPATH=. python -m benchmarks.explain --max-rows 10000
+
+Cada cenário de leitura de `benchmarks.load` (GET e `POST .../batch-get`) é
+executado uma vez pelo app; os comandos SQL emitidos, no primário ou nas réplicas,
+são capturados com os parâmetros e passam por `EXPLAIN (FORMAT JSON)` no primário. O script termina com código 1 se algum plano tiver
+Seq Scan em tabela com mais de `--max-rows` linhas (pelas estatísticas do
+planner), fora os cenários de `PERMITIDOS`. Com atletas particionada, também
+falha se um cenário de `PODA` (filtros pela chave de partição) ler todas as
+partições em alguma consulta.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import event, text
+
+from benchmarks.load import CENARIOS, estado_inicial
+from workout_api.configs.database import engine, replica_engines
+from workout_api.contrib.cache import ReferenceCache
+from workout_api.contrib.count import count_cache
+from workout_api.main import app
+
+# Cenários em que a varredura completa é esperada, com o motivo
+PERMITIDOS = {
+    'atleta_listar': 'total=exact conta a tabela inteira; total=estimate evita a varredura',
+    'atleta_listar_pagina_profunda': 'total=exact conta a tabela inteira, como em atleta_listar',
+    'atleta_filtrar_nome': "ILIKE '%...%' na coluna crua; o índice trigram cobre só ?search=",
+    'atleta_exportar': "filtro por nome com ILIKE '%...%', como em atleta_filtrar_nome",
+}
+
+# Cenários que filtram por created_at e centro_treinamento_id, as chaves de
+# ATLETAS_PARTITIONING: o planner deve descartar partições
+PODA = ('atleta_filtrar_centro_periodo',)
+
+Comando = Tuple[str, Any]
+
+_capturados: ContextVar[Optional[List[Comando]]] = ContextVar('capturados', default=None)
+
+
+def _capturar(conn, cursor, statement, parameters, context, executemany):
+    capturados = _capturados.get()
+    if capturados is not None and not executemany and statement.lstrip().upper().startswith('SELECT'):
+        capturados.append((statement, parameters))
+
+
+# Com DATABASE_REPLICA_URLS as leituras vão para as réplicas; o EXPLAIN roda no primário
+for _engine in (engine, *replica_engines):
+    event.listen(_engine.sync_engine, 'before_cursor_execute', _capturar)
+
+
+def _seq_scans(plano: Dict[str, Any]) -> Iterator[str]:
+    if plano['Node Type'] == 'Seq Scan':
+        yield plano['Relation Name']
+    for filho in plano.get('Plans', []):
+        yield from _seq_scans(filho)
+
+
+def _relacoes(plano: Dict[str, Any]) -> Iterator[str]:
+    if 'Relation Name' in plano:
+        yield plano['Relation Name']
+    for filho in plano.get('Plans', []):
+        yield from _relacoes(filho)
+
+
+async def _particoes() -> List[str]:
+    async with engine.connect() as conn:
+        linhas = await conn.execute(text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'atletas'::regclass"
+        ))
+        return linhas.scalars().all()
+
+
+async def _tamanhos() -> Dict[str, int]:
+    async with engine.connect() as conn:
+        linhas = await conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind IN ('r', 'm', 'p')"
+        ))
+        return dict(linhas.all())
+
+
+async def _explicar(statement: str, parameters: Any) -> Dict[str, Any]:
+    async with engine.connect() as conn:
+        plano = (await conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)).scalar_one()
+    return (json.loads(plano) if isinstance(plano, str) else plano)[0]['Plan']
+
+
+async def main(max_rows: int, seed: int) -> int:
+    estado = await estado_inicial(seed)
+    tamanhos = await _tamanhos()
+    particoes = set(await _particoes())
+    falhas = 0
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                for cenario in CENARIOS:
+                    if cenario.method != 'GET' and not cenario.rota.endswith('/batch-get'):
+                        continue
+                    # Sem cache, para que todos os comandos do cenário cheguem ao banco
+                    count_cache.clear()
+                    for cache in ReferenceCache.registry.values():
+                        cache.cache.clear()
+
+                    capturados: List[Comando] = []
+                    token = _capturados.set(capturados)
+                    try:
+                        await client.request(cenario.method, **cenario.montar(estado))
+                    finally:
+                        _capturados.reset(token)
+
+                    for statement, parameters in capturados:
+                        plano = await _explicar(statement, parameters)
+                        lidas = particoes.intersection(_relacoes(plano))
+                        if cenario.nome in PODA and len(particoes) > 1 and lidas == particoes:
+                            falhas += 1
+                            print(f'{cenario.nome:<32} lê todas as {len(particoes)} partições de atletas: FALHA')
+                            print(f"    {' '.join(statement.split())[:300]}")
+
+                        varridas = [
+                            tabela for tabela in _seq_scans(plano)
+                            if tamanhos.get(tabela, 0) > max_rows
+                        ]
+                        if not varridas:
+                            continue
+                        motivo = PERMITIDOS.get(cenario.nome)
+                        situacao = f'permitido ({motivo})' if motivo else 'FALHA'
+                        falhas += motivo is None
+                        print(f"{cenario.nome:<32} Seq Scan em {', '.join(varridas)}: {situacao}")
+                        print(f"    {' '.join(statement.split())[:300]}")
+    finally:
+        await engine.dispose()
+
+    print(f'{falhas} consulta(s) com Seq Scan acima de {max_rows} linhas')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=10_000, help='tamanho a partir do qual Seq Scan falha')
+    parser.add_argument('--seed', type=int, default=42, help='semente dos valores aleatórios')
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.max_rows, args.seed)))
@@ -0,0 +1,363 @@
+"""Teste de carga de todas as rotas da API, em processo, contra o banco de benchmark.
+
+Uso (depois de `python -m benchmarks.seed --reset`):
+
+    PYTHONPATH=. python -m benchmarks.load --requests 500 --concurrency 32 --output depois.json
+    PYTHONPATH=. python -m benchmarks.load --baseline antes.json
+
+As requisições passam pelo app inteiro (middlewares, validação, serialização) via
+transporte ASGI do httpx, sem rede. Para cada cenário são medidos p50/p95/p99,
+vazão e comandos SQL por requisição; o resultado em JSON pode ser comparado entre
+execuções com `benchmarks.compare`.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, event, func, select
+
+from benchmarks.compare import comparar
+from benchmarks.seed import NOMES, SOBRENOMES
+from workout_api.atleta.models import AtletaModel
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+from workout_api.configs.database import async_session, engine, replica_engines
+from workout_api.configs.settings import settings
+from workout_api.contrib.idempotency import IDEMPOTENCY_TABLE
+from workout_api.main import app
+
+# CPFs da massa do seed começam com 0; os criados aqui, com 7
+CPF_PREFIXO = '7'
+NOME_PREFIXO = 'bench-'
+
+_comandos: ContextVar[Optional[List[int]]] = ContextVar('comandos', default=None)
+
+
+def _contar_comando(*args: Any) -> None:
+    contador = _comandos.get()
+    if contador is not None:
+        contador[0] += 1
+
+
+# Leituras podem ir para as réplicas (DATABASE_REPLICA_URLS): conta em todos os engines
+for _engine in (engine, *replica_engines):
+    event.listen(_engine.sync_engine, 'before_cursor_execute', _contar_comando)
+
+
+@dataclass
+class Estado:
+    """Tamanho da massa e ids criados durante a execução, usados para montar requisições."""
+
+    atletas: int
+    categorias: int
+    centros: int
+    rng: random.Random
+    sequencia: count = field(default_factory=lambda: count(1))
+    criados: List[int] = field(default_factory=list)
+
+    def atleta_in(self) -> Dict[str, Any]:
+        return {
+            'nome': f'{self.rng.choice(NOMES)} {self.rng.choice(SOBRENOMES)}',
+            'cpf': f'{CPF_PREFIXO}{next(self.sequencia):010d}',
+            'idade': self.rng.randint(14, 63),
+            'peso': round(self.rng.uniform(45, 115), 1),
+            'altura': round(self.rng.uniform(1.5, 2.0), 2),
+            'sexo': self.rng.choice('MF'),
+            'categoria_id': self.rng.randint(1, self.categorias),
+            'centro_treinamento_id': self.rng.randint(1, self.centros),
+        }
+
+    def retentativa(self) -> Dict[str, Any]:
+        """Uma de poucas criações repetidas com a mesma Idempotency-Key, como um cliente após timeout."""
+        n = self.rng.randint(1, 20)
+        rng = random.Random(n)
+        return {
+            'url': '/atletas/',
+            'headers': {'Idempotency-Key': f'{NOME_PREFIXO}{n}'},
+            'json': {
+                'nome': f'{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}',
+                'cpf': f'{CPF_PREFIXO}9{n:09d}',
+                'idade': rng.randint(14, 63),
+                'peso': round(rng.uniform(45, 115), 1),
+                'altura': round(rng.uniform(1.5, 2.0), 2),
+                'sexo': rng.choice('MF'),
+                'categoria_id': 1,
+                'centro_treinamento_id': 1,
+            },
+        }
+
+
+@dataclass
+class Cenario:
+    nome: str
+    method: str
+    rota: str
+    montar: Callable[[Estado], Dict[str, Any]]
+    depois: Optional[Callable[[Estado, httpx.Response], None]] = None
+
+
+def _guardar_criado(estado: Estado, response: httpx.Response) -> None:
+    estado.criados.append(response.json()['pk_id'])
+
+
+def _guardar_importados(estado: Estado, response: httpx.Response) -> None:
+    estado.criados.extend(r['pk_id'] for r in response.json()['resultados'] if r['pk_id'])
+
+
+def _atleta_existente(estado: Estado) -> int:
+    return estado.rng.randint(1, estado.atletas)
+
+
+CENARIOS = [
+    Cenario('atleta_criar', 'POST', '/atletas/',
+            lambda e: {'url': '/atletas/', 'json': e.atleta_in()}, _guardar_criado),
+    Cenario('atleta_criar_retentativa', 'POST', '/atletas/', lambda e: e.retentativa()),
+    Cenario('atleta_importar_100', 'POST', '/atletas/bulk',
+            lambda e: {'url': '/atletas/bulk', 'json': [e.atleta_in() for _ in range(100)]},
+            _guardar_importados),
+    Cenario('atleta_atualizar_lote', 'PATCH', '/atletas/bulk',
+            lambda e: {'url': '/atletas/bulk', 'json': {
+                'ids': e.criados[-100:] or [_atleta_existente(e)], 'dados': {'idade': e.rng.randint(14, 63)}}}),
+    Cenario('atleta_excluir_lote_dry_run', 'DELETE', '/atletas/bulk',
+            lambda e: {'url': '/atletas/bulk', 'params': {
+                'categoria_id': e.rng.randint(1, e.categorias), 'sexo': e.rng.choice('MF'), 'dry_run': 'true'}}),
+    Cenario('atleta_listar', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'page': e.rng.randint(1, 20), 'size': 50}}),
+    Cenario('atleta_listar_pagina_profunda', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'page': max(e.atletas // 100, 1), 'size': 50}}),
+    Cenario('atleta_listar_sem_total', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'page': e.rng.randint(1, 20), 'size': 50, 'total': 'none'}}),
+    Cenario('atleta_listar_cursor', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'pagination': 'cursor', 'size': 50}}),
+    Cenario('atleta_filtrar_nome', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'nome': e.rng.choice(SOBRENOMES), 'size': 50}}),
+    Cenario('atleta_buscar', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'search': e.rng.choice(NOMES).lower(), 'size': 50}}),
+    Cenario('atleta_filtrar_combinado', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {
+                'categoria_id': e.rng.randint(1, e.categorias), 'sexo': e.rng.choice('MF'),
+                'idade_min': 20, 'idade_max': 30, 'size': 50, 'total': 'none'}}),
+    Cenario('atleta_filtrar_centro_periodo', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {
+                'centro_treinamento_id': e.rng.randint(1, e.centros),
+                'created_after': (datetime.utcnow() - timedelta(days=30)).isoformat(), 'size': 50, 'total': 'none'}}),
+    Cenario('atleta_ordenar_nome_cursor', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'pagination': 'cursor', 'order_by': 'nome', 'size': 50}}),
+    Cenario('atleta_listar_campos', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {
+                'fields': 'pk_id,nome,idade', 'order_by': '-created_at', 'pagination': 'cursor', 'size': 50}}),
+    Cenario('atleta_listar_normalizado', 'GET', '/atletas/',
+            lambda e: {'url': '/atletas/', 'params': {'normalize': 'true', 'pagination': 'cursor', 'size': 100}}),
+    Cenario('atleta_exportar', 'GET', '/atletas/export',
+            lambda e: {'url': '/atletas/export',
+                       'params': {'nome': f'{e.rng.choice(NOMES)} {e.rng.choice(SOBRENOMES)} 1'}}),
+    Cenario('atleta_batch_get_200', 'POST', '/atletas/batch-get',
+            lambda e: {'url': '/atletas/batch-get', 'json': {'ids': [_atleta_existente(e) for _ in range(200)]}}),
+    Cenario('atleta_stats', 'GET', '/atletas/stats', lambda e: {'url': '/atletas/stats'}),
+    Cenario('atleta_detalhe', 'GET', '/atletas/{pk_id}',
+            lambda e: {'url': f'/atletas/{_atleta_existente(e)}'}),
+    Cenario('atleta_detalhe_popular', 'GET', '/atletas/{pk_id}', lambda e: {'url': '/atletas/1'}),
+    Cenario('atleta_atualizar', 'PATCH', '/atletas/{pk_id}',
+            lambda e: {'url': f'/atletas/{e.rng.choice(e.criados or [_atleta_existente(e)])}',
+                       'json': {'idade': e.rng.randint(14, 63)}}),
+    Cenario('atleta_excluir', 'DELETE', '/atletas/{pk_id}',
+            lambda e: {'url': f'/atletas/{e.criados.pop() if e.criados else 0}'}),
+    Cenario('categoria_criar', 'POST', '/categorias/',
+            lambda e: {'url': '/categorias/', 'json': {'nome': f'{NOME_PREFIXO}{next(e.sequencia)}'}}),
+    Cenario('categoria_listar', 'GET', '/categorias/',
+            lambda e: {'url': '/categorias/', 'params': {'size': 50}}),
+    Cenario('categoria_detalhe', 'GET', '/categorias/{pk_id}',
+            lambda e: {'url': f'/categorias/{e.rng.randint(1, e.categorias)}'}),
+    Cenario('categoria_batch_get', 'POST', '/categorias/batch-get',
+            lambda e: {'url': '/categorias/batch-get', 'json': {'ids': list(range(1, e.categorias + 1))}}),
+    Cenario('categoria_stats', 'GET', '/categorias/{pk_id}/stats',
+            lambda e: {'url': f'/categorias/{e.rng.randint(1, e.categorias)}/stats'}),
+    Cenario('centro_criar', 'POST', '/centros_treinamento/',
+            lambda e: {'url': '/centros_treinamento/', 'json': {
+                'nome': f'{NOME_PREFIXO}{next(e.sequencia)}', 'endereco': 'Rua do Benchmark, 1',
+                'proprietario': 'Benchmark'}}),
+    Cenario('centro_listar', 'GET', '/centros_treinamento/',
+            lambda e: {'url': '/centros_treinamento/', 'params': {'size': 50}}),
+    Cenario('centro_detalhe', 'GET', '/centros_treinamento/{pk_id}',
+            lambda e: {'url': f'/centros_treinamento/{e.rng.randint(1, e.centros)}'}),
+    Cenario('centro_batch_get', 'POST', '/centros_treinamento/batch-get',
+            lambda e: {'url': '/centros_treinamento/batch-get', 'json': {'ids': list(range(1, e.centros + 1))}}),
+    Cenario('centro_stats', 'GET', '/centros_treinamento/{pk_id}/stats',
+            lambda e: {'url': f'/centros_treinamento/{e.rng.randint(1, e.centros)}/stats'}),
+    Cenario('metricas_prometheus', 'GET', '/metrics', lambda e: {'url': '/metrics'}),
+    Cenario('metricas_pool', 'GET', '/metrics/pool', lambda e: {'url': '/metrics/pool'}),
+    Cenario('metricas_cache', 'GET', '/metrics/cache', lambda e: {'url': '/metrics/cache'}),
+    Cenario('metricas_coalescing', 'GET', '/metrics/coalescing', lambda e: {'url': '/metrics/coalescing'}),
+]
+
+
+def rotas_sem_cenario() -> List[str]:
+    cobertas = {(c.method, c.rota) for c in CENARIOS}
+    return [
+        f'{method} {rota.path}'
+        for rota in app.routes if isinstance(rota, APIRoute)
+        for method in sorted(rota.methods)
+        if (method, rota.path) not in cobertas
+    ]
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo."""
+    return ordenados[max(int(round(p / 100 * len(ordenados))) - 1, 0)]
+
+
+async def executar(
+    client: httpx.AsyncClient,
+    cenario: Cenario,
+    estado: Estado,
+    total: int,
+    concorrencia: int
+) -> Dict[str, Any]:
+    latencias: List[float] = []
+    comandos: List[int] = []
+    status_erro: Dict[int, int] = {}
+    restantes = iter(range(total))
+
+    async def worker() -> None:
+        for _ in restantes:
+            contador = [0]
+            token = _comandos.set(contador)
+            inicio = time.perf_counter()
+            try:
+                response = await client.request(cenario.method, **cenario.montar(estado))
+            finally:
+                _comandos.reset(token)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            comandos.append(contador[0])
+            if response.status_code >= 400:
+                status_erro[response.status_code] = status_erro.get(response.status_code, 0) + 1
+            elif cenario.depois:
+                cenario.depois(estado, response)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        'method': cenario.method,
+        'rota': cenario.rota,
+        'requisicoes': total,
+        'erros': sum(status_erro.values()),
+        'status_erro': {str(codigo): n for codigo, n in sorted(status_erro.items())},
+        'p50_ms': _percentil(latencias, 50),
+        'p95_ms': _percentil(latencias, 95),
+        'p99_ms': _percentil(latencias, 99),
+        'media_ms': sum(latencias) / total,
+        'max_ms': latencias[-1],
+        'throughput_rps': total / duracao,
+        'sql_por_requisicao': sum(comandos) / total,
+        'sql_max': max(comandos),
+    }
+
+
+async def estado_inicial(seed: int) -> Estado:
+    async with async_session() as db_session:
+        atletas, categorias, centros = [
+            (await db_session.execute(select(func.max(model.pk_id)))).scalar_one() or 0
+            for model in (AtletaModel, CategoriaModel, CentroTreinamentoModel)
+        ]
+    if not (atletas and categorias and centros):
+        raise SystemExit('Banco sem massa de benchmark; rode `python -m benchmarks.seed --reset` antes.')
+    return Estado(atletas=atletas, categorias=categorias, centros=centros, rng=random.Random(seed))
+
+
+async def _limpar() -> None:
+    async with async_session() as db_session:
+        await db_session.execute(delete(AtletaModel).where(AtletaModel.cpf.startswith(CPF_PREFIXO)))
+        await db_session.execute(
+            delete(IDEMPOTENCY_TABLE).where(IDEMPOTENCY_TABLE.c.key.startswith(NOME_PREFIXO))
+        )
+        await db_session.execute(delete(CategoriaModel).where(CategoriaModel.nome.startswith(NOME_PREFIXO)))
+        await db_session.execute(
+            delete(CentroTreinamentoModel).where(CentroTreinamentoModel.nome.startswith(NOME_PREFIXO))
+        )
+        await db_session.commit()
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    await _limpar()
+    estado = await estado_inicial(args.seed)
+    cenarios = [c for c in CENARIOS if not args.filtro or any(f in c.nome for f in args.filtro)]
+
+    resultados: Dict[str, Any] = {}
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                for cenario in cenarios:
+                    if args.warmup:
+                        await executar(client, cenario, estado, args.warmup, min(args.concurrency, args.warmup))
+                    resultado = await executar(client, cenario, estado, args.requests, args.concurrency)
+                    resultados[cenario.nome] = resultado
+                    print(
+                        f"{cenario.nome:<32} p50 {resultado['p50_ms']:8.2f} ms  p95 {resultado['p95_ms']:8.2f} ms  "
+                        f"p99 {resultado['p99_ms']:8.2f} ms  {resultado['throughput_rps']:8.1f} req/s  "
+                        f"SQL/req {resultado['sql_por_requisicao']:5.2f}  erros {resultado['erros']}"
+                    )
+    finally:
+        await _limpar()
+        await engine.dispose()
+
+    faltando = rotas_sem_cenario()
+    if faltando:
+        print('Rotas sem cenário de carga: ' + ', '.join(faltando))
+
+    return {
+        'meta': {
+            'criado_em': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'commit': _commit_atual(),
+            'requisicoes': args.requests,
+            'concorrencia': args.concurrency,
+            'seed': args.seed,
+            'massa': {'atletas': estado.atletas, 'categorias': estado.categorias, 'centros': estado.centros},
+            'pool': {'size': settings.DB_POOL_SIZE, 'max_overflow': settings.DB_MAX_OVERFLOW},
+            'rotas_sem_cenario': faltando,
+        },
+        'cenarios': resultados,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requisições medidas por cenário')
+    parser.add_argument('--concurrency', type=int, default=16, help='requisições simultâneas')
+    parser.add_argument('--warmup', type=int, default=10, help='requisições de aquecimento por cenário')
+    parser.add_argument('--seed', type=int, default=42, help='semente dos valores aleatórios')
+    parser.add_argument('--filtro', action='append', help='roda só os cenários cujo nome contém o texto')
+    parser.add_argument('--output', default='benchmark.json', help='arquivo JSON com o resultado')
+    parser.add_argument('--baseline', help='resultado anterior para comparar ao final')
+    args = parser.parse_args()
+
+    resultado = asyncio.run(main(args))
+    with open(args.output, 'w') as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f'Resultado salvo em {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            comparar(json.load(arquivo), resultado)
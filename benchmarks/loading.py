@@ -0,0 +1,88 @@
+"""Confere que as leituras do app carregam todos os relacionamentos que os schemas serializam.
+
+Uso (depois de `python -m benchmarks.seed --reset`):
+
+    PYTHONPATH=. python -m benchmarks.loading
+
+Os relacionamentos dos modelos são `lazy='raise'` e `loading_profile` confere, na
+importação, que o perfil declarado bate com o schema; falta conferir que a
+consulta de cada endpoint aplica o perfil. Cada cenário de leitura de
+`benchmarks.load` (GET e `POST .../batch-get`) é executado uma vez, sem caches
+nem coalescência, para que a resposta sempre venha de objetos recém-lidos do
+banco: um `selectinload`/`joinedload` esquecido vira erro 500. O script termina
+com código 1 se algum cenário falhar ou se alguma rota de leitura do app não
+tiver cenário.
+"""
+import argparse
+import asyncio
+import sys
+from typing import List, Set
+
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from benchmarks.load import CENARIOS, Cenario, Estado, estado_inicial
+from workout_api.configs.database import engine
+from workout_api.configs.settings import settings
+from workout_api.contrib.cache import ReferenceCache
+from workout_api.contrib.count import count_cache
+from workout_api.main import create_app
+
+
+def _leitura(method: str, rota: str) -> bool:
+    return method == 'GET' or rota.endswith('/batch-get')
+
+
+def _rotas_de_leitura(app: FastAPI) -> Set[str]:
+    return {
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and any(_leitura(method, route.path) for method in route.methods)
+    }
+
+
+async def _executar(client: httpx.AsyncClient, cenario: Cenario, estado: Estado) -> str:
+    count_cache.clear()
+    for cache in ReferenceCache.registry.values():
+        cache.cache.clear()
+    try:
+        response = await client.request(cenario.method, **cenario.montar(estado))
+    except Exception as exc:
+        # ResponseValidationError (lazy='raise' ao serializar) só detalha em errors()
+        detalhe = exc.errors() if hasattr(exc, 'errors') else exc
+        return f'{type(exc).__name__}: {str(detalhe)[:300]}'
+    if response.status_code >= 500:
+        return f'status {response.status_code}: {response.text[:200]}'
+    return ''
+
+
+async def main(seed: int) -> int:
+    estado = await estado_inicial(seed)
+    await engine.dispose()
+    # Sem coalescência: uma resposta repetida do TTL não passaria pela consulta
+    app = create_app(settings.model_copy(update={'COALESCE_ENABLED': False, 'DB_POOL_WARMUP': False}))
+    cenarios = [cenario for cenario in CENARIOS if _leitura(cenario.method, cenario.rota)]
+    falhas: List[str] = []
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+            for cenario in cenarios:
+                erro = await _executar(client, cenario, estado)
+                print(f"{cenario.nome:<32} {'FALHA' if erro else 'ok'}")
+                if erro:
+                    print(f'    {erro}')
+                    falhas.append(cenario.nome)
+
+    sem_cenario = _rotas_de_leitura(app) - {cenario.rota for cenario in cenarios}
+    for rota in sorted(sem_cenario):
+        print(f'{rota:<32} sem cenário em benchmarks.load: FALHA')
+
+    total = len(falhas) + len(sem_cenario)
+    print(f'{total} falha(s) em {len(cenarios)} cenários de leitura')
+    return 1 if total else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=42, help='semente dos valores aleatórios')
+    sys.exit(asyncio.run(main(parser.parse_args().seed)))
@@ -0,0 +1,162 @@
+"""Confere a migração de particionamento a1f3c7e9d2b4, ida e volta, contra o banco de benchmark.
+
+Uso (banco em head com ATLETAS_PARTITIONING=none, depois de `python -m benchmarks.seed --reset`):
+
+    PYTHONPATH=. python -m benchmarks.migrations [--modos created_at centro_treinamento]
+
+Para cada modo: volta para a revisão anterior (8f2c4a6e1b97), aplica o head com
+`ATLETAS_PARTITIONING=<modo>` e confere a tabela particionada (linhas, registro
+de CPFs, estatísticas, índices, constraints, triggers e CPF duplicado recusado);
+depois volta de novo, reaplica o head sem particionamento e compara com o
+estado inicial. O script termina com código 1 se alguma conferência falhar.
+Reescreve a tabela atletas várias vezes: não rode contra um banco em uso.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from workout_api.configs.settings import settings
+
+ANTERIOR = '8f2c4a6e1b97'
+ESTRATEGIAS = {'created_at': 'r', 'centro_treinamento': 'h'}
+
+# Trocados pela migração: o índice único em cpf vira a tabela atletas_cpfs
+SUBSTITUIDOS = {'atletas_cpf_key'}
+
+Estado = Dict[str, Any]
+
+
+def _alembic(comando: str, revisao: str, modo: str) -> None:
+    # Em outro processo: env.py e a migração leem ATLETAS_PARTITIONING do ambiente
+    processo = subprocess.run(
+        [sys.executable, '-m', 'alembic', comando, revisao],
+        env={**os.environ, 'ATLETAS_PARTITIONING': modo},
+        capture_output=True,
+        text=True
+    )
+    if processo.returncode:
+        sys.stderr.write(processo.stderr)
+        raise SystemExit(f'alembic {comando} {revisao} falhou com ATLETAS_PARTITIONING={modo}')
+
+
+async def _estado(engine: AsyncEngine) -> Estado:
+    # NullPool: cada leitura abre uma conexão nova, sem planos da tabela recriada
+    async with engine.connect() as conn:
+        async def valor(sql: str) -> Any:
+            return (await conn.execute(text(sql))).scalar()
+
+        async def nomes(sql: str) -> List[str]:
+            return sorted((await conn.execute(text(sql))).scalars())
+
+        registro = await valor("SELECT to_regclass('atletas_cpfs') IS NOT NULL")
+        return {
+            'estrategia': await valor(
+                "SELECT partstrat::text FROM pg_partitioned_table WHERE partrelid = 'atletas'::regclass"
+            ),
+            'linhas': await valor('SELECT count(*) FROM atletas'),
+            'cpfs': await valor('SELECT count(*) FROM atletas_cpfs') if registro else None,
+            'stats': await valor(
+                "SELECT coalesce(sum(quantidade), 0) FROM atletas_stats WHERE escopo = 'categoria'"
+            ),
+            'mv': await valor('SELECT coalesce(sum(quantidade), 0) FROM atletas_stats_mv'),
+            'sequencia': await valor("SELECT pg_get_serial_sequence('atletas', 'pk_id')"),
+            'indices': await nomes("SELECT indexname FROM pg_indexes WHERE tablename = 'atletas'"),
+            'constraints': await nomes(
+                "SELECT conname FROM pg_constraint WHERE conrelid = 'atletas'::regclass AND contype <> 'n'"
+            ),
+            'triggers': await nomes(
+                "SELECT tgname FROM pg_trigger WHERE tgrelid = 'atletas'::regclass AND NOT tgisinternal"
+            ),
+        }
+
+
+async def _cpf_duplicado_recusado(engine: AsyncEngine) -> bool:
+    async with engine.connect() as conn:
+        try:
+            await conn.execute(text(
+                'UPDATE atletas SET cpf = (SELECT cpf FROM atletas ORDER BY pk_id DESC LIMIT 1) '
+                'WHERE pk_id = (SELECT min(pk_id) FROM atletas)'
+            ))
+        except IntegrityError:
+            return True
+        finally:
+            await conn.rollback()
+    return False
+
+
+def _conferir_particionada(modo: str, inicial: Estado, estado: Estado, duplicado_recusado: bool) -> List[str]:
+    esperado = {
+        'estrategia': ESTRATEGIAS[modo],
+        'linhas': inicial['linhas'],
+        'cpfs': inicial['linhas'],
+        'stats': inicial['stats'],
+        'mv': inicial['mv'],
+    }
+    falhas = [
+        f'{chave}: {estado[chave]} (esperado {valor})'
+        for chave, valor in esperado.items() if estado[chave] != valor
+    ]
+    if estado['sequencia'] is None:
+        falhas.append('sequência de pk_id sem dono')
+    for chave in ('indices', 'constraints', 'triggers'):
+        faltando = set(inicial[chave]) - SUBSTITUIDOS - set(estado[chave])
+        if faltando:
+            falhas.append(f"{chave} não recriados: {', '.join(sorted(faltando))}")
+    if not duplicado_recusado:
+        falhas.append('CPF duplicado aceito')
+    return falhas
+
+
+def _conferir_restaurada(inicial: Estado, estado: Estado) -> List[str]:
+    return [
+        f'{chave}: {estado[chave]} (antes {valor})'
+        for chave, valor in inicial.items() if estado[chave] != valor
+    ]
+
+
+async def main(modos: List[str]) -> int:
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        inicial = await _estado(engine)
+        if inicial['estrategia'] is not None:
+            raise SystemExit('Rode com o banco em head e ATLETAS_PARTITIONING=none.')
+
+        falhas = 0
+        for modo in modos:
+            _alembic('downgrade', ANTERIOR, modo)
+            _alembic('upgrade', 'head', modo)
+            estado = await _estado(engine)
+            problemas = _conferir_particionada(modo, inicial, estado, await _cpf_duplicado_recusado(engine))
+            print(f"{modo:<20} upgrade   {len(estado['indices'])} índices, {estado['linhas']} linhas: "
+                  f"{'FALHA' if problemas else 'ok'}")
+
+            _alembic('downgrade', ANTERIOR, modo)
+            _alembic('upgrade', 'head', 'none')
+            restaurados = _conferir_restaurada(inicial, await _estado(engine))
+            print(f"{modo:<20} downgrade {'FALHA' if restaurados else 'ok'}")
+
+            for problema in (*problemas, *restaurados):
+                print(f'    {problema}')
+            falhas += bool(problemas) + bool(restaurados)
+    finally:
+        await engine.dispose()
+
+    print(f'{falhas} conferência(s) com falha')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--modos', nargs='+', choices=list(ESTRATEGIAS), default=list(ESTRATEGIAS),
+        help='particionamentos conferidos'
+    )
+    sys.exit(asyncio.run(main(parser.parse_args().modos)))
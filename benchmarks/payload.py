@@ -0,0 +1,96 @@
+"""Bytes enviados e tempo de codificação de páginas de atletas por formato e compressão.
+
+Uso (não precisa de banco; os dados são montados em memória):
+
+    PYTHONPATH=. python -m benchmarks.payload --sizes 10 50 100 --n 200
+
+Para cada tamanho de página compara a resposta aninhada (categoria e centro
+completos em cada atleta) com a normalizada (`?normalize=true`: só os ids, com
+as referências listadas uma vez), sem compressão, com gzip e, se o pacote
+brotli estiver instalado, com brotli. O tempo inclui a geração do JSON e a
+compressão, com os níveis configurados em `COMPRESSION_*`.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+import orjson
+
+from benchmarks.seed import NOMES, SOBRENOMES
+from workout_api.contrib.compression import _Compressor, brotli
+
+ENCODINGS = ['identity', 'gzip'] + (['br'] if brotli else [])
+
+
+def _paginas(size: int, rng: random.Random) -> Dict[str, Dict[str, Any]]:
+    categorias = {i: {'nome': f'Categoria {i}', 'pk_id': i} for i in range(1, 301)}
+    centros = {
+        i: {'nome': f'CT {i}', 'endereco': f'Rua do Treino, {i * 7}, Centro', 'proprietario': rng.choice(NOMES), 'pk_id': i}
+        for i in range(1, 301)
+    }
+    normalizados = [
+        {
+            'id': str(uuid4()), 'created_at': datetime.utcnow().isoformat(),
+            'nome': f'{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}', 'cpf': f'{i:011d}',
+            'idade': rng.randint(14, 63), 'peso': round(rng.uniform(45, 115), 1),
+            'altura': round(rng.uniform(1.5, 2.0), 2), 'sexo': rng.choice('MF'),
+            'categoria_id': rng.randint(1, 300), 'centro_treinamento_id': rng.randint(1, 300), 'pk_id': i,
+        }
+        for i in range(1, size + 1)
+    ]
+    meta = {'total': 1_000_000, 'page': 1, 'size': size, 'pages': 1_000_000 // size}
+    aninhados = [
+        {**item, 'categoria': categorias[item['categoria_id']], 'centro_treinamento': centros[item['centro_treinamento_id']]}
+        for item in normalizados
+    ]
+    return {
+        'aninhado': {'items': aninhados, **meta},
+        'normalizado': {
+            'items': normalizados, **meta,
+            'categorias': [categorias[i] for i in sorted({item['categoria_id'] for item in normalizados})],
+            'centros_treinamento': [centros[i] for i in sorted({item['centro_treinamento_id'] for item in normalizados})],
+        },
+    }
+
+
+def _codificar(pagina: Dict[str, Any], encoding: str) -> bytes:
+    corpo = orjson.dumps(pagina)
+    if encoding == 'identity':
+        return corpo
+    compressor = _Compressor(encoding)
+    return compressor.compress(corpo) + compressor.finish()
+
+
+def _medir(n: int, fn: Callable[[], bytes]) -> Dict[str, float]:
+    corpo: Optional[bytes] = fn()
+    tempos: List[float] = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        corpo = fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {'bytes': len(corpo), 'encode_ms': round(statistics.median(tempos), 3)}
+
+
+def main(sizes: List[int], n: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"{'página':>6}  {'formato':<12} " + ''.join(f'{e:>22}' for e in ENCODINGS))
+    for size in sizes:
+        for formato, pagina in _paginas(size, rng).items():
+            medidas = [_medir(n, lambda: _codificar(pagina, encoding)) for encoding in ENCODINGS]
+            print(
+                f'{size:>6}  {formato:<12} '
+                + ''.join(f"{m['bytes']:>10} B {m['encode_ms']:>7.3f} ms" for m in medidas)
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100], help='atletas por página')
+    parser.add_argument('--n', type=int, default=200, help='repetições por medida')
+    parser.add_argument('--seed', type=int, default=42, help='semente dos dados')
+    args = parser.parse_args()
+    main(args.sizes, args.n, args.seed)
@@ -0,0 +1,102 @@
+"""Popula um banco de benchmark com volumes realistas.
+
+Uso (banco dedicado, com as migrações aplicadas):
+
+    PYTHONPATH=. python -m benchmarks.seed --reset --atletas 1000000
+
+Os dados são gerados no próprio PostgreSQL com generate_series, sem trafegar
+linhas pela rede. `--reset` apaga atletas, categorias e centros existentes.
+Com atletas particionada por created_at, cria antes as partições mensais do
+período gerado (cerca de um ano para trás).
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from workout_api.atleta.partitions import estrategia
+from workout_api.configs.database import engine
+
+NOMES = [
+    'João', 'José', 'Maria', 'Ana', 'Antônio', 'Francisco', 'Carlos', 'Paulo', 'Lúcia', 'Pedro',
+    'Lucas', 'Luíza', 'Márcia', 'Gabriel', 'Rafael', 'Fernanda', 'Juliana', 'Mateus', 'Letícia', 'Tiago',
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Conceição', 'Araújo', 'Ribeiro', 'Carvalho', 'Melo', 'Barbosa', 'Simões', 'Magalhães', 'Freitas', 'Brandão',
+]
+
+
+async def seed(atletas: int, categorias: int, centros: int, reset: bool) -> None:
+    async with engine.begin() as conn:
+        existentes = (await conn.execute(text('SELECT count(*) FROM categorias'))).scalar_one()
+        if existentes and not reset:
+            raise SystemExit('O banco já tem dados; use --reset para recriar a massa de benchmark.')
+        particionamento = await estrategia(conn)
+        if reset:
+            # atletas_cpfs (atletas particionada) não tem FK para atletas, então não entra no CASCADE
+            tabelas = 'atletas, categorias, centros_treinamento' + (', atletas_cpfs' if particionamento else '')
+            await conn.execute(text(f'TRUNCATE {tabelas} RESTART IDENTITY CASCADE'))
+        if particionamento == 'r':
+            await conn.execute(text(
+                "SELECT atletas_criar_particoes(CAST(timezone('utc', now()) - interval '100000 minutes' * 5 AS date), "
+                "CAST(timezone('utc', now()) + interval '1 month' AS date))"
+            ))
+
+        await conn.execute(text(
+            """
+            INSERT INTO categorias (nome, id)
+            SELECT 'Categoria ' || i, md5('categoria' || i)::uuid
+            FROM generate_series(1, :n) AS i
+            """
+        ), {'n': categorias})
+        await conn.execute(text(
+            """
+            INSERT INTO centros_treinamento (nome, endereco, proprietario, id)
+            SELECT 'CT ' || i, 'Rua ' || i || ', Quadra ' || (i % 50), 'Proprietário ' || (i % 97),
+                   md5('centro' || i)::uuid
+            FROM generate_series(1, :n) AS i
+            """
+        ), {'n': centros})
+
+        inicio = time.perf_counter()
+        await conn.execute(text(
+            """
+            INSERT INTO atletas (nome, cpf, idade, peso, altura, sexo, created_at, updated_at,
+                                 categoria_id, centro_treinamento_id, id)
+            SELECT nomes[1 + i % cardinality(nomes)] || ' ' ||
+                   sobrenomes[1 + (i / cardinality(nomes)) % cardinality(sobrenomes)] || ' ' || i,
+                   lpad(i::text, 11, '0'),
+                   14 + i % 50,
+                   45 + (i % 70) + (i % 10) / 10.0,
+                   1.50 + (i % 50) / 100.0,
+                   CASE WHEN i % 2 = 0 THEN 'M' ELSE 'F' END,
+                   timezone('utc', now()) - (i % 100000) * interval '5 minutes',
+                   timezone('utc', now()) - (i % 1000) * interval '1 minute',
+                   1 + i % :categorias,
+                   1 + (i * 7) % :centros,
+                   md5('atleta' || i)::uuid
+            FROM generate_series(1, :n) AS i,
+                 (SELECT CAST(:nomes AS text[]) AS nomes, CAST(:sobrenomes AS text[]) AS sobrenomes) AS listas
+            """
+        ), {
+            'n': atletas, 'categorias': categorias, 'centros': centros,
+            'nomes': NOMES, 'sobrenomes': SOBRENOMES,
+        })
+        print(f'{atletas} atletas inseridos em {time.perf_counter() - inicio:.1f}s')
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text('ANALYZE atletas, categorias, centros_treinamento'))
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--atletas', type=int, default=1_000_000)
+    parser.add_argument('--categorias', type=int, default=300)
+    parser.add_argument('--centros', type=int, default=300)
+    parser.add_argument('--reset', action='store_true', help='apaga os dados existentes antes de popular')
+    args = parser.parse_args()
+    asyncio.run(seed(args.atletas, args.categorias, args.centros, args.reset))
@@ -0,0 +1,108 @@
+"""Compara a serialização de uma página de atletas: objetos ORM + Pydantic x linhas + ORJSON.
+
+Uso (não precisa de banco; os dados são montados em memória):
+
+    PYTHONPATH=. python -m benchmarks.serialization --size 100 --n 500
+
+O caminho antigo é o que o FastAPI fazia em `list_atletas`: validar `Page[AtletaOut]`
+a partir dos objetos ORM (com categoria e centro aninhados), converter com
+`jsonable_encoder` e gerar o JSON com `JSONResponse`. O novo monta os dicionários
+das tuplas com `Projection` e gera o JSON com `ORJSONResponse`.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Tuple
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from fastapi_pagination import Params
+
+from workout_api.atleta.controller import ATLETA_ROWS
+from workout_api.atleta.models import AtletaModel
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+from workout_api.contrib.pagination import Page
+from workout_api.contrib.serialization import orjson_page
+from workout_api.main import app
+
+
+def _dados(size: int) -> Tuple[List[AtletaModel], List[Tuple[Any, ...]]]:
+    categoria = CategoriaModel(pk_id=1, nome='Scale', id=uuid4())
+    centro = CentroTreinamentoModel(
+        pk_id=1, nome='CT King', endereco='Rua X, Q02', proprietario='Marcos', id=uuid4()
+    )
+    atletas = [
+        AtletaModel(
+            pk_id=i, id=uuid4(), nome=f'Atleta {i}', cpf=f'{i:011d}', idade=20 + i % 40,
+            peso=70.5, altura=1.75, sexo='M', created_at=datetime.utcnow(), updated_at=datetime.utcnow(),
+            categoria_id=1, categoria=categoria, centro_treinamento_id=1, centro_treinamento=centro,
+        )
+        for i in range(1, size + 1)
+    ]
+    linhas = [
+        tuple(
+            getattr(atleta, coluna.name) if '__' not in coluna.name
+            else getattr(getattr(atleta, coluna.name.split('__')[0]), coluna.name.split('__')[1])
+            for coluna in ATLETA_ROWS.columns
+        )
+        for atleta in atletas
+    ]
+    return atletas, linhas
+
+
+def _normalizar(pagina: dict) -> dict:
+    for item in pagina['items']:
+        item['created_at'] = datetime.fromisoformat(item['created_at'])
+    return pagina
+
+
+def _medir(nome: str, n: int, fn: Callable[[], bytes]) -> bytes:
+    fn()
+    tempos = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        corpo = fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    print(
+        f'{nome:<28} p50: {statistics.median(tempos):7.3f} ms  '
+        f'p95: {tempos[int(len(tempos) * 0.95) - 1]:7.3f} ms  {len(corpo)} bytes'
+    )
+    return corpo
+
+
+def main(size: int, n: int) -> None:
+    atletas, linhas = _dados(size)
+    params = Params(page=1, size=size)
+    rota = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == '/atletas/' and 'GET' in r.methods)
+    loop = asyncio.new_event_loop()
+
+    def orm_pydantic() -> bytes:
+        pagina = Page.create(items=atletas, total=size, params=params)
+        conteudo = loop.run_until_complete(serialize_response(field=rota.response_field, response_content=pagina))
+        return JSONResponse(conteudo).body
+
+    def linhas_orjson() -> bytes:
+        pagina = Page.create(items=[ATLETA_ROWS.build(linha) for linha in linhas], total=size, params=params)
+        return orjson_page(pagina).body
+
+    antigo = _medir('ORM + Pydantic + json', n, orm_pydantic)
+    novo = _medir('linhas + ORJSON', n, linhas_orjson)
+    loop.close()
+
+    # O Pydantic corta zeros à direita dos microssegundos e o orjson não; o valor é o mesmo
+    if _normalizar(json.loads(novo)) != _normalizar(json.loads(antigo)):
+        print('Aviso: os dois caminhos geraram JSON diferente')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100, help='atletas por página')
+    parser.add_argument('--n', type=int, default=500, help='repetições por caminho')
+    args = parser.parse_args()
+    main(args.size, args.n)
@@ -0,0 +1,154 @@
+"""Vazão do servidor de produção contra o uvicorn padrão de um worker, por HTTP real.
+
+Uso (depois de `python -m benchmarks.seed --reset`):
+
+    PYTHONPATH=. python -m benchmarks.serve --duration 20 --concurrency 64 --output serve.json
+
+Cada configuração sobe o servidor num processo novo, espera a primeira resposta,
+gera carga nas rotas de leitura mais usadas a partir de `--clients` processos
+(para o gerador não ser o gargalo) e encerra com SIGTERM, medindo o tempo de
+drenagem. Configurações:
+
+- `uvicorn`: `uvicorn workout_api.main:app`, o alvo `make run` sem `--reload`;
+- `serve_1`: `python -m workout_api.serve` com um worker (uvloop/httptools, se instalados);
+- `serve`: `python -m workout_api.serve` com `--workers` workers (padrão: um por CPU).
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import httpx
+
+ROTAS = [
+    '/atletas/1',
+    '/atletas/?size=50&total=none',
+    '/atletas/?pagination=cursor&size=50',
+    '/categorias/1',
+    '/centros_treinamento/1',
+]
+
+
+def _comandos(porta: int, workers: int) -> Dict[str, Dict[str, Any]]:
+    serve = [sys.executable, '-m', 'workout_api.serve']
+    return {
+        'uvicorn': {'cmd': [sys.executable, '-m', 'uvicorn', 'workout_api.main:app', '--port', str(porta)], 'env': {}},
+        'serve_1': {'cmd': serve, 'env': {'SERVER_PORT': str(porta), 'SERVER_WORKERS': '1'}},
+        'serve': {'cmd': serve, 'env': {'SERVER_PORT': str(porta), 'SERVER_WORKERS': str(workers)}},
+    }
+
+
+def _aguardar(url: str, timeout: float = 60.0) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            if httpx.get(url + ROTAS[0]).status_code < 400:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{url} não respondeu em {timeout:.0f}s')
+
+
+async def _gerar(url: str, duracao: float, concorrencia: int) -> Dict[str, Any]:
+    latencias: List[float] = []
+    erros = 0
+    limite = time.monotonic() + duracao
+
+    async def worker(n: int) -> None:
+        nonlocal erros
+        i = n
+        while time.monotonic() < limite:
+            inicio = time.perf_counter()
+            try:
+                response = await client.get(ROTAS[i % len(ROTAS)])
+                if response.status_code >= 400:
+                    erros += 1
+            except httpx.TransportError:
+                erros += 1
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            i += 1
+
+    limits = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        await asyncio.gather(*(worker(n) for n in range(concorrencia)))
+    return {'latencias': latencias, 'erros': erros}
+
+
+def _cliente(url: str, duracao: float, concorrencia: int) -> Dict[str, Any]:
+    return asyncio.run(_gerar(url, duracao, concorrencia))
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)] if ordenados else 0.0
+
+
+def _medir(config: Dict[str, Any], porta: int, args: argparse.Namespace) -> Dict[str, Any]:
+    url = f'http://127.0.0.1:{porta}'
+    processo = subprocess.Popen(
+        config['cmd'], env={**os.environ, **config['env']},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _aguardar(url)
+        _cliente(url, 2.0, min(args.concurrency, 8))
+        por_cliente = max(args.concurrency // args.clients, 1)
+        with ProcessPoolExecutor(args.clients) as pool:
+            partes = list(pool.map(_cliente, *zip(*[(url, args.duration, por_cliente)] * args.clients)))
+    finally:
+        inicio = time.perf_counter()
+        processo.send_signal(signal.SIGTERM)
+        processo.wait(timeout=120)
+        drenagem = time.perf_counter() - inicio
+
+    latencias = sorted(l for parte in partes for l in parte['latencias'])
+    return {
+        'requests': len(latencias),
+        'erros': sum(parte['erros'] for parte in partes),
+        'rps': round(len(latencias) / args.duration, 1),
+        'p50_ms': round(_percentil(latencias, 0.50), 2),
+        'p99_ms': round(_percentil(latencias, 0.99), 2),
+        'media_ms': round(statistics.fmean(latencias), 2) if latencias else 0.0,
+        'shutdown_s': round(drenagem, 2),
+    }
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    workers = args.workers or os.cpu_count() or 1
+    resultados = {}
+    for nome, config in _comandos(args.port, workers).items():
+        resultados[nome] = _medir(config, args.port, args)
+
+    print(f"{'configuração':<10} {'req/s':>10} {'p50':>10} {'p99':>10} {'erros':>7} {'shutdown':>9}")
+    for nome, r in resultados.items():
+        print(
+            f"{nome:<10} {r['rps']:>10.1f} {r['p50_ms']:>7.2f} ms {r['p99_ms']:>7.2f} ms "
+            f"{r['erros']:>7} {r['shutdown_s']:>7.2f} s"
+        )
+    return {
+        'meta': {'duration': args.duration, 'concurrency': args.concurrency, 'clients': args.clients,
+                 'workers': workers, 'rotas': ROTAS},
+        'resultados': resultados,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=20.0, help='segundos de carga por configuração')
+    parser.add_argument('--concurrency', type=int, default=64, help='requisições simultâneas no total')
+    parser.add_argument('--clients', type=int, default=4, help='processos geradores de carga')
+    parser.add_argument('--workers', type=int, default=0, help='workers da configuração serve (0: um por CPU)')
+    parser.add_argument('--port', type=int, default=8765, help='porta usada pelos servidores')
+    parser.add_argument('--output', help='arquivo JSON com o resultado')
+    args = parser.parse_args()
+    resultado = main(args)
+    if args.output:
+        with open(args.output, 'w') as arquivo:
+            json.dump(resultado, arquivo, indent=1)
@@ -0,0 +1,88 @@
+"""Mede o tempo de inicialização do app e a latência das primeiras requisições.
+
+Uso (depois de `python -m benchmarks.seed --reset`):
+
+    PYTHONPATH=. python -m benchmarks.startup --runs 5 --output startup.json
+
+Cada execução é um processo Python novo, como um worker recém-iniciado: mede o
+import de `workout_api.main` (que monta o app com `create_app`), o lifespan de
+inicialização (aquecimento do pool), a primeira e a segunda chamada de rotas
+quentes e o encerramento. O conjunto roda com `DB_POOL_WARMUP=false` e `true`,
+e o resultado é a mediana das execuções.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+ROTAS = ['/atletas/1', '/atletas/?size=50', '/categorias/1', '/atletas/stats']
+
+
+def _ms(inicio: float) -> float:
+    return round((time.perf_counter() - inicio) * 1000, 2)
+
+
+async def _processo() -> Dict[str, float]:
+    inicio = time.perf_counter()
+    import httpx
+    from workout_api.main import app
+    tempos = {'import_ms': _ms(inicio)}
+
+    inicio = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        tempos['startup_ms'] = _ms(inicio)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            for chamada in ('primeira', 'segunda'):
+                for rota in ROTAS:
+                    inicio = time.perf_counter()
+                    response = await client.get(rota)
+                    tempos[f'{chamada} {rota}'] = _ms(inicio)
+                    if response.status_code >= 400:
+                        raise RuntimeError(f'{rota} respondeu {response.status_code}; rode o seed antes')
+        inicio = time.perf_counter()
+    tempos['shutdown_ms'] = _ms(inicio)
+    return tempos
+
+
+def _executar(warmup: bool, runs: int) -> Dict[str, float]:
+    env = {**os.environ, 'DB_POOL_WARMUP': str(warmup).lower()}
+    execucoes: List[Dict[str, float]] = []
+    for _ in range(runs):
+        saida = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--processo'],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        execucoes.append(json.loads(saida.strip().splitlines()[-1]))
+    return {metrica: statistics.median(e[metrica] for e in execucoes) for metrica in execucoes[0]}
+
+
+def main(runs: int) -> Dict[str, Any]:
+    resultados = {f'warmup_{str(warmup).lower()}': _executar(warmup, runs) for warmup in (False, True)}
+
+    sem, com = resultados['warmup_false'], resultados['warmup_true']
+    print(f"{'métrica':<32} {'sem warmup':>12} {'com warmup':>12}")
+    for metrica in sem:
+        print(f'{metrica:<32} {sem[metrica]:>9.2f} ms {com[metrica]:>9.2f} ms')
+    return {'meta': {'runs': runs, 'rotas': ROTAS}, 'resultados': resultados}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='processos por configuração')
+    parser.add_argument('--output', help='arquivo JSON com o resultado')
+    parser.add_argument('--processo', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.processo:
+        print(json.dumps(asyncio.run(_processo())))
+    else:
+        resultado = main(args.runs)
+        if args.output:
+            with open(args.output, 'w') as arquivo:
+                json.dump(resultado, arquivo, indent=1)
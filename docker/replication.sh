@@ -0,0 +1,5 @@
+#!/bin/sh
+# Executado pelo entrypoint do postgres na primeira inicialização do primário:
+# libera conexões de replicação para o serviço db-replica do docker-compose.
+set -e
+echo "host replication all all md5" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Delete, Update
+
+from workout_api.atleta.filters import AtletaFilters
+from workout_api.atleta.models import AtletaModel
+from workout_api.atleta.partitions import ATLETAS_CPFS, estrategia_atual
+from workout_api.atleta.schemas import AtletaBulkChangeOut, AtletaBulkItem, AtletaBulkOut, AtletaIn, AtletaUpdate
+from workout_api.categorias.cache import categoria_cache
+from workout_api.centro_treinamento.cache import centro_treinamento_cache
+from workout_api.configs.settings import settings
+from workout_api.contrib.batch import match_ids, unique_ids
+
+BATCH_SIZE = 1000
+MAX_ROWS = 100_000
+# Com atletas particionada: novas tentativas de um lote cujos CPFs foram gravados
+# por outra transação entre a consulta a atletas_cpfs e o INSERT
+MAX_TENTATIVAS = 3
+
+JSON_TYPES = ('application/json',)
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+CSV_TYPES = ('text/csv', 'application/csv')
+
+
+def parse_body(body: bytes, content_type: str) -> List[Any]:
+    """Converte o corpo da importação (JSON, NDJSON ou CSV) em uma lista de registros.
+
+    Linhas de NDJSON que não são JSON válido viram o texto original, para serem
+    rejeitadas individualmente na validação.
+    """
+    media_type = content_type.split(';')[0].strip().lower()
+    try:
+        texto = body.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='O arquivo de importação deve estar em UTF-8.'
+        )
+
+    if media_type in JSON_TYPES:
+        try:
+            registros = json.loads(texto)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='JSON inválido na importação de atletas.'
+            )
+        if not isinstance(registros, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='A importação em JSON deve ser uma lista de atletas.'
+            )
+    elif media_type in NDJSON_TYPES:
+        registros = []
+        for linha in texto.splitlines():
+            if not linha.strip():
+                continue
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                registros.append(linha)
+    elif media_type in CSV_TYPES:
+        registros = [
+            {chave: valor for chave, valor in registro.items() if chave is not None}
+            for registro in csv.DictReader(io.StringIO(texto))
+        ]
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f'Formato de importação não suportado: {media_type or "desconhecido"}'
+        )
+
+    if len(registros) > MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'A importação aceita no máximo {MAX_ROWS} atletas por requisição.'
+        )
+    return registros
+
+
+def _erro_validacao(exc: ValidationError) -> str:
+    return '; '.join(
+        f"{'.'.join(str(parte) for parte in erro['loc']) or 'registro'}: {erro['msg']}"
+        for erro in exc.errors()
+    )
+
+
+async def import_atletas(db_session: AsyncSession, registros: List[Any]) -> AtletaBulkOut:
+    """Valida e insere atletas em lote, devolvendo o resultado de cada registro.
+
+    Categorias e centros de treinamento referenciados são resolvidos pelo cache de
+    referência, com no máximo uma consulta cada para os que faltarem; as inserções
+    usam `INSERT ... ON CONFLICT (cpf) DO NOTHING RETURNING` em lotes de
+    `BATCH_SIZE`, de forma que um CPF repetido rejeita só o próprio registro.
+    Com atletas particionada não há índice único em cpf para o ON CONFLICT:
+    os CPFs já cadastrados são descartados antes pela consulta a `atletas_cpfs`,
+    repetida até `MAX_TENTATIVAS` vezes se outra transação gravar os mesmos CPFs.
+    """
+    resultados = [AtletaBulkItem(linha=linha) for linha in range(1, len(registros) + 1)]
+    validos: List[Tuple[AtletaBulkItem, AtletaIn]] = []
+    cpfs_vistos: Dict[str, int] = {}
+
+    for resultado, registro in zip(resultados, registros):
+        if isinstance(registro, dict) and isinstance(registro.get('cpf'), str):
+            resultado.cpf = registro['cpf']
+        try:
+            atleta_in = AtletaIn.model_validate(registro)
+        except ValidationError as exc:
+            resultado.erro = _erro_validacao(exc)
+            continue
+
+        if atleta_in.cpf in cpfs_vistos:
+            resultado.erro = f'CPF repetido na importação (linha {cpfs_vistos[atleta_in.cpf]})'
+            continue
+        cpfs_vistos[atleta_in.cpf] = resultado.linha
+        validos.append((resultado, atleta_in))
+
+    categorias = await categoria_cache.get_many(
+        db_session, {atleta_in.categoria_id for _, atleta_in in validos}
+    )
+    centros = await centro_treinamento_cache.get_many(
+        db_session, {atleta_in.centro_treinamento_id for _, atleta_in in validos}
+    )
+
+    pendentes: Dict[str, AtletaBulkItem] = {}
+    linhas: List[Dict[str, Any]] = []
+    for resultado, atleta_in in validos:
+        if atleta_in.categoria_id not in categorias:
+            resultado.erro = f'Categoria com id {atleta_in.categoria_id} não encontrada.'
+        elif atleta_in.centro_treinamento_id not in centros:
+            resultado.erro = f'Centro de treinamento com id {atleta_in.centro_treinamento_id} não encontrado.'
+        else:
+            pendentes[atleta_in.cpf] = resultado
+            linhas.append(atleta_in.model_dump())
+
+    for inicio in range(0, len(linhas), BATCH_SIZE):
+        for pk_id, cpf in await _inserir_lote(db_session, linhas[inicio:inicio + BATCH_SIZE]):
+            pendentes.pop(cpf).pk_id = pk_id
+    await db_session.commit()
+
+    for cpf, resultado in pendentes.items():
+        resultado.erro = f'Já existe um atleta cadastrado com o CPF: {cpf}'
+
+    criados = sum(1 for resultado in resultados if resultado.pk_id is not None)
+    return AtletaBulkOut(
+        criados=criados,
+        rejeitados=len(resultados) - criados,
+        resultados=resultados
+    )
+
+
+async def _inserir_lote(db_session: AsyncSession, lote: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+    tabela = AtletaModel.__table__
+    statement = insert(tabela).returning(tabela.c.pk_id, tabela.c.cpf)
+    if await estrategia_atual(db_session) is None:
+        return (await db_session.execute(statement.on_conflict_do_nothing(index_elements=[tabela.c.cpf]), lote)).all()
+
+    for _ in range(MAX_TENTATIVAS):
+        cadastrados = set((await db_session.execute(
+            select(ATLETAS_CPFS.c.cpf).where(ATLETAS_CPFS.c.cpf.in_([linha['cpf'] for linha in lote]))
+        )).scalars())
+        lote = [linha for linha in lote if linha['cpf'] not in cadastrados]
+        if not lote:
+            return []
+        try:
+            async with db_session.begin_nested():
+                return (await db_session.execute(statement, lote)).all()
+        except IntegrityError as exc:
+            # Outra transação gravou um desses CPFs depois da consulta: consulta de novo
+            if 'atletas_cpfs_pkey' not in str(exc.orig):
+                raise
+    # Sob concorrência contínua nos mesmos CPFs, o que sobrou do lote sai como conflito
+    return []
+
+
+def bulk_selection(
+    db_session: AsyncSession,
+    filtros: AtletaFilters,
+    ids: Optional[List[int]]
+) -> ColumnElement:
+    """WHERE das operações em lote: os ids do corpo combinados com os filtros de `list_atletas`.
+
+    Sem nenhum critério a operação alcançaria a tabela inteira, então é recusada.
+    """
+    if not filtros and not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Informe ids ou ao menos um filtro para a operação em lote.'
+        )
+    if ids and len(ids) > MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'A operação em lote aceita no máximo {MAX_ROWS} ids por requisição.'
+        )
+
+    query = filtros.apply(select(AtletaModel.pk_id))
+    if ids:
+        query = query.where(match_ids(db_session, AtletaModel.pk_id, unique_ids(ids)))
+    return query.whereclause
+
+
+async def _validar_referencias(db_session: AsyncSession, dados: Dict[str, Any]) -> None:
+    # Uma leitura (normalmente do cache) por destino, em vez de uma violação de FK no meio do UPDATE
+    categoria_id = dados.get('categoria_id')
+    if categoria_id is not None and not await categoria_cache.get(db_session, categoria_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Categoria com id {categoria_id} não encontrada.'
+        )
+    centro_id = dados.get('centro_treinamento_id')
+    if centro_id is not None and not await centro_treinamento_cache.get(db_session, centro_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Centro de treinamento com id {centro_id} não encontrado.'
+        )
+
+
+async def _simular(db_session: AsyncSession, where: ColumnElement, return_ids: bool) -> AtletaBulkChangeOut:
+    if not return_ids:
+        afetados = (await db_session.execute(select(func.count()).where(where))).scalar_one()
+        return AtletaBulkChangeOut(afetados=afetados, dry_run=True)
+
+    # count(*) OVER () é calculado antes do LIMIT: o total sai na mesma consulta dos ids
+    linhas = (await db_session.execute(
+        select(AtletaModel.pk_id, func.count().over()).where(where)
+        .order_by(AtletaModel.pk_id).limit(settings.BULK_RETURN_IDS_MAX)
+    )).all()
+    return AtletaBulkChangeOut(
+        afetados=linhas[0][1] if linhas else 0, ids=[pk_id for pk_id, _ in linhas], dry_run=True
+    )
+
+
+async def _aplicar(
+    db_session: AsyncSession,
+    statement: Union[Update, Delete],
+    return_ids: bool
+) -> AtletaBulkChangeOut:
+    if not return_ids:
+        afetados = (await db_session.execute(statement)).rowcount
+        await db_session.commit()
+        return AtletaBulkChangeOut(afetados=afetados, dry_run=False)
+
+    # O RETURNING fica numa CTE para o banco devolver só os primeiros
+    # BULK_RETURN_IDS_MAX ids, e não um por linha alterada
+    alterados = statement.returning(AtletaModel.__table__.c.pk_id).cte('alterados')
+    linhas = (await db_session.execute(
+        select(alterados.c.pk_id, func.count().over())
+        .order_by(alterados.c.pk_id).limit(settings.BULK_RETURN_IDS_MAX)
+    )).all()
+    await db_session.commit()
+    return AtletaBulkChangeOut(
+        afetados=linhas[0][1] if linhas else 0, ids=[pk_id for pk_id, _ in linhas], dry_run=False
+    )
+
+
+async def update_atletas(
+    db_session: AsyncSession,
+    where: ColumnElement,
+    atleta_up: AtletaUpdate,
+    dry_run: bool = False,
+    return_ids: bool = False
+) -> AtletaBulkChangeOut:
+    """Aplica os mesmos campos a todos os atletas de `where` com um único `UPDATE`.
+
+    Os ids afetados só são devolvidos com `return_ids`, limitados a `BULK_RETURN_IDS_MAX`.
+    """
+    dados = atleta_up.model_dump(exclude_unset=True)
+    if not dados:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Nenhum campo informado para atualizar.'
+        )
+    await _validar_referencias(db_session, dados)
+    if dry_run:
+        return await _simular(db_session, where, return_ids)
+
+    return await _aplicar(db_session, update(AtletaModel.__table__).where(where).values(**dados), return_ids)
+
+
+async def delete_atletas(
+    db_session: AsyncSession,
+    where: ColumnElement,
+    dry_run: bool = False,
+    return_ids: bool = False
+) -> AtletaBulkChangeOut:
+    """Exclui todos os atletas de `where` com um único `DELETE`; ids como em `update_atletas`."""
+    if dry_run:
+        return await _simular(db_session, where, return_ids)
+
+    return await _aplicar(db_session, delete(AtletaModel.__table__).where(where), return_ids)
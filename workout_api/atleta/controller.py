@@ -1,68 +1,130 @@
-from typing import Optional
-from fastapi import APIRouter, Body, HTTPException, status, Query, Depends
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import orjson
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status, Query, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, update
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
-
-from fastapi_pagination import Page, Params, add_pagination
-
-from workout_api.atleta.schemas import AtletaIn, AtletaOut, AtletaUpdate
+from sqlalchemy.orm import aliased, contains_eager
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import CTE
+
+from fastapi_pagination import Params, add_pagination
+
+from workout_api.atleta.bulk import bulk_selection, delete_atletas, import_atletas, parse_body, update_atletas
+from workout_api.atleta.export import MEDIA_TYPES, ExportFormat, export_query, stream_export
+from workout_api.atleta.filters import AtletaFilters, AtletaOrdering, ordering
+from workout_api.atleta.schemas import (
+    AtletaBulkChangeOut, AtletaBulkOut, AtletaBulkSelection, AtletaBulkUpdate,
+    AtletaIn, AtletaOut, AtletaStatsOut, AtletaUpdate
+)
+from workout_api.atleta.stats import read_stats
 from workout_api.atleta.models import AtletaModel
-from workout_api.categorias.models import CategoriaModel
-from workout_api.centro_treinamento.models import CentroTreinamentoModel
-from workout_api.configs.database import get_session
+from workout_api.categorias.cache import categoria_cache
+from workout_api.centro_treinamento.cache import centro_treinamento_cache
+from workout_api.configs.database import get_read_session, get_session
+from workout_api.contrib.batch import BatchGetIn, BatchOut, batch_get
+from workout_api.contrib.conditional import is_conditional, list_etag, make_etag, not_modified, set_validators
+from workout_api.contrib.count import count_cache
+from workout_api.contrib.idempotency import IdempotencyKey, StoredResponse, capture, idempotent, request_hash
+from workout_api.contrib.loading import loading_profile
+from workout_api.contrib.pagination import CursorPage, CursorParams, Page, TotalQuery, paginate
+from workout_api.contrib.search import SearchQuery, apply_search
+from workout_api.contrib.serialization import FieldsQuery, Projection, RowsResponse, orjson_page, parse_fields
+from workout_api.contrib.singleflight import SingleFlight
 
 router = APIRouter()
 
+ATLETA_OUT = loading_profile(AtletaModel, AtletaOut, 'categoria', 'centro_treinamento')
+ATLETA_ROWS = Projection(AtletaModel, AtletaOut)
 
-@router.post(
-    '/',
-    summary='Criar um novo atleta',
-    status_code=status.HTTP_201_CREATED,
-    response_model=AtletaOut
-)
-async def create_atleta(
-    atleta_in: AtletaIn = Body(...),
-    db_session: AsyncSession = Depends(get_session)
-):
-    # Verificar existência de categoria
-    categoria = (await db_session.execute(
-        select(CategoriaModel).filter_by(pk_id=atleta_in.categoria_id))
-    ).scalars().first()
-    if not categoria:
-        raise HTTPException(
+# Na resposta normalizada (?normalize=true): relacionamento -> (coluna de FK, lista de referência, cache)
+REFERENCIAS = {
+    'categoria': ('categoria_id', 'categorias', categoria_cache),
+    'centro_treinamento': ('centro_treinamento_id', 'centros_treinamento', centro_treinamento_cache),
+}
+
+create_flight: SingleFlight[Tuple[StoredResponse, bool]] = SingleFlight()
+
+# Nomes gerados pelo PostgreSQL para as constraints da migração c006e8463eb4
+CPF_UNIQUE = 'atletas_cpf_key'
+CATEGORIA_FK = 'atletas_categoria_id_fkey'
+CENTRO_TREINAMENTO_FK = 'atletas_centro_treinamento_id_fkey'
+
+
+def _select_atleta_out(escrita: CTE) -> Select:
+    """Lê o atleta devolvido pelo RETURNING de `escrita` já com categoria e centro.
+
+    O INSERT/UPDATE e a leitura da resposta saem em um único comando.
+    """
+    atleta = aliased(AtletaModel, escrita)
+    return (
+        select(atleta)
+        .join(atleta.categoria)
+        .join(atleta.centro_treinamento)
+        .options(contains_eager(atleta.categoria), contains_eager(atleta.centro_treinamento))
+        .execution_options(populate_existing=True)
+    )
+
+
+async def _referencias(
+    db_session: AsyncSession,
+    items: List[Dict[str, Any]],
+    campos: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Categorias e centros referenciados pelos itens de uma página normalizada, sem repetição."""
+    tabelas = {}
+    for coluna, nome, cache in REFERENCIAS.values():
+        if coluna in campos:
+            encontrados = await cache.get_many(db_session, {item[coluna] for item in items})
+            tabelas[nome] = [encontrados[pk_id].model_dump() for pk_id in sorted(encontrados)]
+    return tabelas
+
+
+def _atleta_etag(pk_id: int, updated_at: datetime) -> str:
+    return make_etag(AtletaModel.__tablename__, pk_id, updated_at.isoformat())
+
+
+def _integrity_error(e: IntegrityError, dados: dict, detalhe_padrao: str) -> HTTPException:
+    # asyncpg expõe o nome da constraint na exceção original
+    constraint = getattr(e.orig.__cause__, 'constraint_name', None) or str(e.orig)
+
+    if CATEGORIA_FK in constraint:
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f'Categoria com id {atleta_in.categoria_id} não encontrada.'
+            detail=f'Categoria com id {dados.get("categoria_id")} não encontrada.'
         )
-
-    # Verificar existência de centro de treinamento
-    centro = (await db_session.execute(
-        select(CentroTreinamentoModel).filter_by(pk_id=atleta_in.centro_treinamento_id))
-    ).scalars().first()
-    if not centro:
-        raise HTTPException(
+    if CENTRO_TREINAMENTO_FK in constraint:
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f'Centro de treinamento com id {atleta_in.centro_treinamento_id} não encontrado.'
+            detail=f'Centro de treinamento com id {dados.get("centro_treinamento_id")} não encontrado.'
+        )
+    if CPF_UNIQUE in constraint or 'cpf' in constraint.lower():
+        return HTTPException(
+            status_code=303,
+            detail=f"Já existe um atleta cadastrado com o CPF: {dados.get('cpf')}"
         )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=detalhe_padrao
+    )
+
+
+async def _insert_atleta(atleta_in: AtletaIn, db_session: AsyncSession) -> StoredResponse:
+    tabela = AtletaModel.__table__
+    novo = insert(tabela).values(**atleta_in.model_dump()).returning(*tabela.c).cte('novo')
 
     try:
-        atleta_model = AtletaModel(**atleta_in.model_dump())
-        db_session.add(atleta_model)
+        await db_session.connection(execution_options={'isolation_level': 'AUTOCOMMIT'})
+        atleta_model = (await db_session.execute(_select_atleta_out(novo))).scalars().one()
         await db_session.commit()
-        await db_session.refresh(atleta_model)
     except IntegrityError as e:
         await db_session.rollback()
-        if 'cpf' in str(e.orig).lower():
-            raise HTTPException(
-                status_code=303,
-                detail=f"Já existe um atleta cadastrado com o CPF: {atleta_in.cpf}"
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='Erro ao inserir dados no banco'
-            )
+        raise _integrity_error(e, atleta_in.model_dump(), 'Erro ao inserir dados no banco')
     except Exception:
         await db_session.rollback()
         raise HTTPException(
@@ -70,38 +132,209 @@ async def create_atleta(
             detail='Erro ao inserir dados no banco'
         )
 
-    return AtletaOut.from_orm(atleta_model)
+    count_cache.invalidate(AtletaModel.__tablename__)
+    return StoredResponse(
+        status.HTTP_201_CREATED,
+        orjson.dumps(AtletaOut.model_validate(atleta_model).model_dump(mode='json'))
+    )
+
+
+@router.post(
+    '/',
+    summary='Criar um novo atleta',
+    status_code=status.HTTP_201_CREATED,
+    response_model=AtletaOut
+)
+async def create_atleta(
+    atleta_in: AtletaIn = Body(...),
+    idempotency_key: IdempotencyKey = None,
+    db_session: AsyncSession = Depends(get_session)
+):
+    hash_ = request_hash(atleta_in.model_dump())
+
+    async def inserir() -> Tuple[StoredResponse, bool]:
+        executar = partial(capture, partial(_insert_atleta, atleta_in, db_session))
+        if idempotency_key:
+            return await idempotent(db_session, idempotency_key, hash_, executar)
+        return await executar(), False
+
+    # Retentativas simultâneas (mesma chave, ou mesmo corpo e portanto mesmo CPF)
+    # esperam o INSERT em andamento em vez de disputar a constraint de CPF
+    chave = ('key', idempotency_key) if idempotency_key else ('cpf', atleta_in.cpf)
+    (resposta, repetida), compartilhada = await create_flight.run((*chave, hash_), inserir)
+    return resposta.render(replayed=repetida or compartilhada)
+
+
+@router.post(
+    '/bulk',
+    summary='Importar atletas em lote (JSON, NDJSON ou CSV)',
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaBulkOut,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/json': {'schema': {'type': 'array', 'items': {'$ref': '#/components/schemas/AtletaIn'}}},
+                'application/x-ndjson': {'schema': {'type': 'string'}},
+                'text/csv': {'schema': {'type': 'string'}},
+            }
+        }
+    }
+)
+async def bulk_create_atletas(
+    request: Request,
+    db_session: AsyncSession = Depends(get_session)
+):
+    registros = parse_body(await request.body(), request.headers.get('content-type', ''))
+    return await import_atletas(db_session, registros)
+
+
+@router.patch(
+    '/bulk',
+    summary='Atualizar atletas em lote por ids e/ou filtros',
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaBulkChangeOut
+)
+async def bulk_update_atletas(
+    atleta_bulk: AtletaBulkUpdate = Body(...),
+    filtros: AtletaFilters = Depends(),
+    dry_run: bool = Query(False, description='Apenas informa quais atletas seriam alterados'),
+    return_ids: bool = Query(False, description='Inclui na resposta os ids afetados, até BULK_RETURN_IDS_MAX'),
+    db_session: AsyncSession = Depends(get_session)
+):
+    where = bulk_selection(db_session, filtros, atleta_bulk.ids)
+    try:
+        resultado = await update_atletas(db_session, where, atleta_bulk.dados, dry_run, return_ids)
+    except IntegrityError as e:
+        await db_session.rollback()
+        raise _integrity_error(e, atleta_bulk.dados.model_dump(), 'Erro ao atualizar dados no banco')
+
+    if resultado.afetados and not dry_run:
+        count_cache.invalidate(AtletaModel.__tablename__)
+    return resultado
+
+
+@router.delete(
+    '/bulk',
+    summary='Deletar atletas em lote por ids e/ou filtros',
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaBulkChangeOut
+)
+async def bulk_delete_atletas(
+    selecao: Optional[AtletaBulkSelection] = Body(None),
+    filtros: AtletaFilters = Depends(),
+    dry_run: bool = Query(False, description='Apenas informa quais atletas seriam excluídos'),
+    return_ids: bool = Query(False, description='Inclui na resposta os ids afetados, até BULK_RETURN_IDS_MAX'),
+    db_session: AsyncSession = Depends(get_session)
+):
+    where = bulk_selection(db_session, filtros, selecao.ids if selecao else None)
+    resultado = await delete_atletas(db_session, where, dry_run, return_ids)
+
+    if resultado.afetados and not dry_run:
+        count_cache.invalidate(AtletaModel.__tablename__)
+    return resultado
 
 
 @router.get(
     '/',
     summary='Listar atletas com filtros e paginação',
-    response_model=Page[AtletaOut]
+    response_model=Union[Page[AtletaOut], CursorPage[AtletaOut]]
 )
 async def list_atletas(
-    nome: Optional[str] = Query(None, description='Filtrar por nome do atleta'),
-    cpf: Optional[str] = Query(None, description='Filtrar por CPF do atleta'),
+    request: Request,
+    filtros: AtletaFilters = Depends(),
+    search: SearchQuery = None,
+    order_by: AtletaOrdering = Query('pk_id', description='Ordenação; prefixo - para decrescente'),
+    fields: FieldsQuery = None,
+    normalize: bool = Query(
+        False, description='Itens só com os ids de categoria e centro, listados uma vez em categorias e centros_treinamento'
+    ),
     params: Params = Depends(),
-    db_session: AsyncSession = Depends(get_session)
+    cursor: CursorParams = Depends(),
+    total: TotalQuery = 'exact',
+    db_session: AsyncSession = Depends(get_read_session)
 ):
-    query = select(AtletaModel)
+    query = filtros.apply(select(AtletaModel))
+    sort_column, descending = ordering(order_by)
+
+    rank = None
+    if search:
+        query, rank = apply_search(query, AtletaModel.nome, search)
 
-    if nome:
-        query = query.filter(AtletaModel.nome.ilike(f'%{nome}%'))
+    etag, total_count = await list_etag(
+        db_session, request, query, AtletaModel.updated_at, counted=total == 'exact' and not cursor.enabled
+    )
+    if etag and (resposta := not_modified(request, etag)):
+        return resposta
+
+    campos = parse_fields(fields, AtletaOut) if fields else None
+    if normalize:
+        # Sem JOIN: os objetos aninhados viram seus ids e saem do cache de referência
+        campos = [
+            REFERENCIAS[campo][0] if campo in REFERENCIAS else campo for campo in campos or AtletaOut.model_fields
+        ]
+
+    projection = ATLETA_ROWS
+    if campos is not None:
+        # As chaves do cursor entram no SELECT mesmo fora de fields
+        projection = ATLETA_ROWS.only(set(campos), extra=(sort_column, AtletaModel.pk_id))
+
+    pagina = await paginate(
+        db_session, query, params, cursor,
+        sort_column=sort_column, pk_column=AtletaModel.pk_id, descending=descending,
+        projection=projection, total=total, rank=rank, known_total=total_count
+    )
+    if normalize:
+        resposta = orjson_page(pagina, **await _referencias(db_session, pagina.items, campos))
+    else:
+        resposta = orjson_page(pagina)
+    if etag:
+        set_validators(resposta, etag)
+    return resposta
 
-    if cpf:
-        query = query.filter(AtletaModel.cpf == cpf)
 
-    total_result = await db_session.execute(
-        select(func.count()).select_from(query.subquery())
+@router.post(
+    '/batch-get',
+    summary='Consultar vários atletas pelos ids',
+    status_code=status.HTTP_200_OK,
+    response_model=BatchOut[AtletaOut]
+)
+async def batch_get_atletas(
+    batch_in: BatchGetIn = Body(...),
+    db_session: AsyncSession = Depends(get_read_session)
+):
+    return RowsResponse(await batch_get(
+        db_session, select(AtletaModel), AtletaModel.pk_id, ATLETA_ROWS, batch_in.ids
+    ))
+
+
+@router.get(
+    '/export',
+    summary='Exportar atletas em NDJSON ou CSV',
+    response_class=StreamingResponse,
+    responses={200: {'content': {'application/x-ndjson': {}, 'text/csv': {}}}}
+)
+async def export_atletas(
+    filtros: AtletaFilters = Depends(),
+    formato: ExportFormat = Query('ndjson', alias='format', description='Formato da exportação'),
+    db_session: AsyncSession = Depends(get_read_session)
+):
+    query = filtros.apply(export_query())
+    return StreamingResponse(
+        stream_export(db_session, query, formato),
+        media_type=MEDIA_TYPES[formato],
+        headers={'Content-Disposition': f'attachment; filename=atletas.{formato}'}
     )
-    total_count = total_result.scalar_one()
 
-    offset = (params.page - 1) * params.size
-    result = await db_session.execute(query.offset(offset).limit(params.size))
-    items = result.scalars().all()
 
-    return Page.create(items=items, total=total_count, params=params)
+@router.get(
+    '/stats',
+    summary='Estatísticas gerais dos atletas',
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaStatsOut
+)
+async def atletas_stats(db_session: AsyncSession = Depends(get_read_session)):
+    return await read_stats(db_session, 'total')
 
 
 @router.get(
@@ -112,10 +345,22 @@ async def list_atletas(
 )
 async def get_atleta(
     pk_id: int,
-    db_session: AsyncSession = Depends(get_session)
+    request: Request,
+    response: Response,
+    db_session: AsyncSession = Depends(get_read_session)
 ):
+    if is_conditional(request):
+        # Só a versão, pelo índice da chave primária, antes de montar a resposta
+        updated_at = (await db_session.execute(
+            select(AtletaModel.updated_at).filter_by(pk_id=pk_id))
+        ).scalar_one_or_none()
+        if updated_at is not None:
+            resposta = not_modified(request, _atleta_etag(pk_id, updated_at), updated_at)
+            if resposta:
+                return resposta
+
     atleta = (await db_session.execute(
-        select(AtletaModel).filter_by(pk_id=pk_id))
+        select(AtletaModel).options(*ATLETA_OUT).filter_by(pk_id=pk_id))
     ).scalars().first()
 
     if not atleta:
@@ -124,7 +369,8 @@ async def get_atleta(
             detail=f'Atleta não encontrado para o id {pk_id}'
         )
 
-    return AtletaOut.from_orm(atleta)
+    set_validators(response, _atleta_etag(atleta.pk_id, atleta.updated_at), atleta.updated_at)
+    return atleta
 
 
 @router.patch(
@@ -138,56 +384,28 @@ async def update_atleta(
     atleta_up: AtletaUpdate = Body(...),
     db_session: AsyncSession = Depends(get_session)
 ):
-    atleta = (await db_session.execute(
-        select(AtletaModel).filter_by(pk_id=pk_id))
-    ).scalars().first()
-
-    if not atleta:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f'Atleta não encontrado para o id {pk_id}'
-        )
-
     dados_update = atleta_up.model_dump(exclude_unset=True)
 
-    if 'categoria_id' in dados_update:
-        categoria = (await db_session.execute(
-            select(CategoriaModel).filter_by(pk_id=dados_update['categoria_id']))
-        ).scalars().first()
-        if not categoria:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f'Categoria com id {dados_update["categoria_id"]} não encontrada.'
-            )
-
-    if 'centro_treinamento_id' in dados_update:
-        centro = (await db_session.execute(
-            select(CentroTreinamentoModel).filter_by(pk_id=dados_update['centro_treinamento_id']))
-        ).scalars().first()
-        if not centro:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f'Centro de treinamento com id {dados_update["centro_treinamento_id"]} não encontrado.'
-            )
-
-    for chave, valor in dados_update.items():
-        setattr(atleta, chave, valor)
+    if dados_update:
+        tabela = AtletaModel.__table__
+        alterado = (
+            update(tabela)
+            .where(tabela.c.pk_id == pk_id)
+            .values(**dados_update)
+            .returning(*tabela.c)
+            .cte('alterado')
+        )
+        query = _select_atleta_out(alterado)
+    else:
+        query = select(AtletaModel).options(*ATLETA_OUT).filter_by(pk_id=pk_id)
 
     try:
+        await db_session.connection(execution_options={'isolation_level': 'AUTOCOMMIT'})
+        atleta = (await db_session.execute(query)).scalars().first()
         await db_session.commit()
-        await db_session.refresh(atleta)
     except IntegrityError as e:
         await db_session.rollback()
-        if 'cpf' in str(e.orig).lower():
-            raise HTTPException(
-                status_code=303,
-                detail=f"Já existe um atleta cadastrado com o CPF: {dados_update.get('cpf')}"
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail='Erro ao atualizar dados no banco'
-            )
+        raise _integrity_error(e, dados_update, 'Erro ao atualizar dados no banco')
     except Exception:
         await db_session.rollback()
         raise HTTPException(
@@ -195,7 +413,16 @@ async def update_atleta(
             detail='Erro ao atualizar dados no banco'
         )
 
-    return AtletaOut.from_orm(atleta)
+    if not atleta:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Atleta não encontrado para o id {pk_id}'
+        )
+
+    if dados_update:
+        count_cache.invalidate(AtletaModel.__tablename__)
+
+    return atleta
 
 
 @router.delete(
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Literal
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from workout_api.atleta.models import AtletaModel
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+
+ExportFormat = Literal['ndjson', 'csv']
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+STREAM_BATCH_SIZE = 1000
+
+
+def export_query() -> Select:
+    """Colunas exportadas, com os nomes de categoria e centro resolvidos por join."""
+    return (
+        select(
+            AtletaModel.pk_id,
+            AtletaModel.id,
+            AtletaModel.nome,
+            AtletaModel.cpf,
+            AtletaModel.idade,
+            AtletaModel.peso,
+            AtletaModel.altura,
+            AtletaModel.sexo,
+            AtletaModel.created_at,
+            AtletaModel.categoria_id,
+            CategoriaModel.nome.label('categoria'),
+            AtletaModel.centro_treinamento_id,
+            CentroTreinamentoModel.nome.label('centro_treinamento'),
+        )
+        .join(CategoriaModel, CategoriaModel.pk_id == AtletaModel.categoria_id)
+        .join(CentroTreinamentoModel, CentroTreinamentoModel.pk_id == AtletaModel.centro_treinamento_id)
+        .order_by(AtletaModel.pk_id)
+    )
+
+
+def _json_default(valor: Any) -> str:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, UUID):
+        return str(valor)
+    raise TypeError(f'Valor não serializável na exportação: {valor!r}')
+
+
+async def stream_export(
+    db_session: AsyncSession,
+    query: Select,
+    formato: ExportFormat
+) -> AsyncIterator[bytes]:
+    """Envia as linhas de `query` em blocos conforme chegam do cursor do servidor.
+
+    Nada além de um bloco de `STREAM_BATCH_SIZE` linhas fica em memória.
+    """
+    result = await db_session.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    colunas = list(result.keys())
+
+    if formato == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(colunas)
+        yield buffer.getvalue().encode()
+
+        async for linhas in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(linhas)
+            yield buffer.getvalue().encode()
+        return
+
+    async for linhas in result.partitions():
+        yield ''.join(
+            json.dumps(dict(zip(colunas, linha)), default=_json_default, ensure_ascii=False) + '\n'
+            for linha in linhas
+        ).encode()
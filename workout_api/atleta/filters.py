@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from typing import Literal, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+from workout_api.atleta.models import AtletaModel
+
+AtletaOrdering = Literal['pk_id', '-pk_id', 'nome', '-nome', 'idade', '-idade', 'created_at', '-created_at']
+
+# Cada ordenação tem um índice (coluna, pk_id) na migração 3d6a8b1f0c52 ou 7b3f9d2e6a14
+ORDERING_COLUMNS = {
+    'pk_id': AtletaModel.pk_id,
+    'nome': AtletaModel.nome,
+    'idade': AtletaModel.idade,
+    'created_at': AtletaModel.created_at,
+}
+
+
+def _naive_utc(valor: Optional[datetime]) -> Optional[datetime]:
+    # created_at é gravado como UTC sem fuso (datetime.utcnow)
+    if valor is not None and valor.tzinfo is not None:
+        return valor.astimezone(timezone.utc).replace(tzinfo=None)
+    return valor
+
+
+class AtletaFilters:
+    """Filtros combináveis da listagem e da exportação de atletas.
+
+    Só os filtros informados entram no WHERE, então o planner recebe o mesmo
+    formato de consulta que os índices compostos da migração 3d6a8b1f0c52 cobrem.
+    """
+
+    def __init__(
+        self,
+        nome: Optional[str] = Query(None, description='Filtrar por nome do atleta'),
+        cpf: Optional[str] = Query(None, description='Filtrar por CPF do atleta'),
+        categoria_id: Optional[int] = Query(None, description='Filtrar pelo id da categoria'),
+        centro_treinamento_id: Optional[int] = Query(None, description='Filtrar pelo id do centro de treinamento'),
+        idade_min: Optional[int] = Query(None, ge=0, description='Idade mínima (inclusive)'),
+        idade_max: Optional[int] = Query(None, ge=0, description='Idade máxima (inclusive)'),
+        sexo: Optional[str] = Query(None, max_length=1, description='Filtrar por sexo do atleta'),
+        created_after: Optional[datetime] = Query(None, description='Criados a partir deste momento (inclusive)'),
+        created_before: Optional[datetime] = Query(None, description='Criados antes deste momento'),
+    ):
+        if idade_min is not None and idade_max is not None and idade_min > idade_max:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'idade_min ({idade_min}) maior que idade_max ({idade_max}).'
+            )
+        self.nome = nome
+        self.cpf = cpf
+        self.categoria_id = categoria_id
+        self.centro_treinamento_id = centro_treinamento_id
+        self.idade_min = idade_min
+        self.idade_max = idade_max
+        self.sexo = sexo
+        self.created_after = _naive_utc(created_after)
+        self.created_before = _naive_utc(created_before)
+
+    def __bool__(self) -> bool:
+        """Verdadeiro se algum filtro foi informado."""
+        return any(valor not in (None, '') for valor in vars(self).values())
+
+    def apply(self, query: Select) -> Select:
+        if self.nome:
+            query = query.filter(AtletaModel.nome.ilike(f'%{self.nome}%'))
+        if self.cpf:
+            query = query.filter(AtletaModel.cpf == self.cpf)
+        if self.categoria_id is not None:
+            query = query.filter(AtletaModel.categoria_id == self.categoria_id)
+        if self.centro_treinamento_id is not None:
+            query = query.filter(AtletaModel.centro_treinamento_id == self.centro_treinamento_id)
+        if self.sexo:
+            query = query.filter(AtletaModel.sexo == self.sexo)
+        if self.idade_min is not None:
+            query = query.filter(AtletaModel.idade >= self.idade_min)
+        if self.idade_max is not None:
+            query = query.filter(AtletaModel.idade <= self.idade_max)
+        if self.created_after is not None:
+            query = query.filter(AtletaModel.created_at >= self.created_after)
+        if self.created_before is not None:
+            query = query.filter(AtletaModel.created_at < self.created_before)
+        return query
+
+
+def ordering(order_by: AtletaOrdering) -> Tuple[InstrumentedAttribute, bool]:
+    """Coluna e direção de um valor de `order_by` (prefixo `-` = decrescente)."""
+    return ORDERING_COLUMNS[order_by.lstrip('-')], order_by.startswith('-')
@@ -14,9 +14,12 @@ class AtletaModel(BaseModel):
     altura: Mapped[float] = mapped_column(Float, nullable=False)
     sexo: Mapped[str] = mapped_column(String(1), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     categoria_id: Mapped[int] = mapped_column(ForeignKey("categorias.pk_id"))
-    categoria: Mapped['CategoriaModel'] = relationship(back_populates="atletas", lazy='selectin')
+    categoria: Mapped['CategoriaModel'] = relationship(back_populates="atletas", lazy='raise')
 
     centro_treinamento_id: Mapped[int] = mapped_column(ForeignKey("centros_treinamento.pk_id"))
-    centro_treinamento: Mapped['CentroTreinamentoModel'] = relationship(back_populates="atletas", lazy='selectin')
+    centro_treinamento: Mapped['CentroTreinamentoModel'] = relationship(back_populates="atletas", lazy='raise')
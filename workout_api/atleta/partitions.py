@@ -0,0 +1,196 @@
+"""Manutenção das partições de atletas criadas pela migração a1f3c7e9d2b4.
+
+    python -m workout_api.atleta.partitions listar
+    python -m workout_api.atleta.partitions criar [--meses 3]
+    python -m workout_api.atleta.partitions arquivar --antes 2024-01-01 [--drop] [--dry-run]
+
+`criar` e `arquivar` valem para o particionamento por created_at. Agende `criar`
+ao menos uma vez por mês: linhas de um mês sem partição caem em `atletas_default`,
+e a partição desse mês não pode mais ser criada enquanto elas estiverem lá.
+`arquivar` desanexa as partições mensais que terminam até `--antes` e as move
+para o schema `arquivo` (ou as exclui com `--drop`), sem DELETE linha a linha.
+"""
+import argparse
+import asyncio
+from datetime import date
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import Integer, String, column, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from workout_api.configs.database import engine
+from workout_api.configs.settings import settings
+
+# Registro global de CPFs da migração a1f3c7e9d2b4: com atletas particionada, o
+# índice único em cpf só existiria por partição
+ATLETAS_CPFS = table(
+    'atletas_cpfs',
+    column('cpf', String),
+    column('pk_id', Integer),
+)
+
+# Igual ao APLICAR da migração d4c7a2e9f0b3, com sinal -1, para tirar dos totais as
+# linhas da partição arquivada sem reconstruir atletas_stats inteira
+SUBTRAIR_STATS = """
+    INSERT INTO atletas_stats AS s
+        (escopo, ref_id, sexo, quantidade, soma_idade, soma_peso, soma_altura, atualizado_em)
+    SELECT d.escopo, d.ref_id, t.sexo, -count(*), -sum(t.idade), -sum(t.peso), -sum(t.altura),
+           timezone('utc', now())
+    FROM {particao} AS t,
+         LATERAL (VALUES ('categoria', t.categoria_id),
+                         ('centro_treinamento', t.centro_treinamento_id)) AS d (escopo, ref_id)
+    GROUP BY d.escopo, d.ref_id, t.sexo
+    ORDER BY d.escopo, d.ref_id, t.sexo
+    ON CONFLICT (escopo, ref_id, sexo) DO UPDATE SET
+        quantidade = s.quantidade + EXCLUDED.quantidade,
+        soma_idade = s.soma_idade + EXCLUDED.soma_idade,
+        soma_peso = s.soma_peso + EXCLUDED.soma_peso,
+        soma_altura = s.soma_altura + EXCLUDED.soma_altura,
+        atualizado_em = EXCLUDED.atualizado_em
+"""
+
+
+# partstrat de atletas por processo da API: trocar o particionamento exige rodar a
+# migração a1f3c7e9d2b4 de novo, com a API parada
+_estrategias: Dict[str, Optional[str]] = {}
+
+
+async def estrategia(conn: Union[AsyncConnection, AsyncSession]) -> Optional[str]:
+    """'r' (range), 'h' (hash) ou None se atletas não é particionada."""
+    return (await conn.execute(text(
+        "SELECT partstrat::text FROM pg_partitioned_table WHERE partrelid = 'atletas'::regclass"
+    ))).scalar()
+
+
+async def estrategia_atual(db_session: AsyncSession) -> Optional[str]:
+    """`estrategia` consultada no catálogo uma vez por processo.
+
+    Vale o que a migração aplicou no banco, não o ATLETAS_PARTITIONING de quem
+    está rodando a API.
+    """
+    if 'atletas' not in _estrategias:
+        _estrategias['atletas'] = (
+            await estrategia(db_session) if db_session.bind.dialect.name == 'postgresql' else None
+        )
+    return _estrategias['atletas']
+
+
+async def listar(conn: AsyncConnection) -> List[Dict[str, Any]]:
+    resultado = await conn.execute(text(
+        """
+        SELECT c.relname AS nome, pg_get_expr(c.relpartbound, c.oid) AS limites,
+               greatest(c.reltuples, 0)::bigint AS linhas_estimadas
+        FROM pg_inherits AS i JOIN pg_class AS c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'atletas'::regclass
+        ORDER BY c.relname
+        """
+    ))
+    return [dict(linha) for linha in resultado.mappings()]
+
+
+async def criar(conn: AsyncConnection, meses: int) -> int:
+    """Cria as partições mensais que faltam do mês atual até `meses` à frente."""
+    return (await conn.execute(
+        text(
+            "SELECT atletas_criar_particoes(CAST(timezone('utc', now()) AS date), "
+            "CAST(timezone('utc', now()) + make_interval(months => :meses + 1) AS date))"
+        ),
+        {'meses': meses}
+    )).scalar()
+
+
+def _fim(nome: str) -> Optional[date]:
+    # atletas_pYYYYMM cobre [YYYY-MM-01, primeiro dia do mês seguinte)
+    sufixo = nome.removeprefix('atletas_p')
+    if nome == sufixo or len(sufixo) != 6 or not sufixo.isdigit():
+        return None
+    ano, mes = int(sufixo[:4]), int(sufixo[4:])
+    return date(ano + mes // 12, mes % 12 + 1, 1)
+
+
+async def arquivar(
+    conn: AsyncConnection,
+    antes: date,
+    schema: str = 'arquivo',
+    drop: bool = False,
+    dry_run: bool = False
+) -> List[str]:
+    """Desanexa as partições mensais inteiramente anteriores a `antes`.
+
+    Para cada uma: bloqueia escritas na partição, tira suas linhas de
+    `atletas_stats` (quando os triggers a mantêm) e de `atletas_cpfs`, faz o DETACH e move
+    a tabela para `schema` ou a exclui. Tudo na transação de `conn`.
+    """
+    particoes = [
+        linha['nome'] for linha in await listar(conn)
+        if (fim := _fim(linha['nome'])) is not None and fim <= antes
+    ]
+    if dry_run or not particoes:
+        return particoes
+
+    # Mesma condição dos triggers de atletas_stats: vale o workout.stats_mode da
+    # sessão (engine_options, ALTER ROLE ou PgBouncer), não o STATS_MODE local
+    incremental = (await conn.execute(
+        text("SELECT current_setting('workout.stats_mode', true)")
+    )).scalar() != 'materialized'
+    if not drop:
+        await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+    for particao in particoes:
+        await conn.execute(text(f'LOCK TABLE {particao} IN SHARE MODE'))
+        if incremental:
+            await conn.execute(text(SUBTRAIR_STATS.format(particao=particao)))
+        await conn.execute(text(
+            f'DELETE FROM atletas_cpfs AS c USING {particao} AS a WHERE c.cpf = a.cpf'
+        ))
+        await conn.execute(text(f'ALTER TABLE atletas DETACH PARTITION {particao}'))
+        if drop:
+            await conn.execute(text(f'DROP TABLE {particao}'))
+        else:
+            await conn.execute(text(f'ALTER TABLE {particao} SET SCHEMA "{schema}"'))
+    return particoes
+
+
+async def _executar(conn: AsyncConnection, args: argparse.Namespace) -> None:
+    tipo = await estrategia(conn)
+    if tipo is None:
+        raise SystemExit('A tabela atletas não é particionada (ATLETAS_PARTITIONING=none).')
+
+    if args.comando == 'listar':
+        for particao in await listar(conn):
+            print(f"{particao['nome']:<20} {particao['linhas_estimadas']:>12}  {particao['limites']}")
+        return
+
+    if tipo != 'r':
+        raise SystemExit(f'O comando {args.comando} vale só para o particionamento por created_at.')
+    if args.comando == 'criar':
+        print(f'{await criar(conn, args.meses)} partições criadas')
+    else:
+        particoes = await arquivar(conn, args.antes, args.schema, args.drop, args.dry_run)
+        acao = 'seriam arquivadas' if args.dry_run else ('excluídas' if args.drop else f'movidas para {args.schema}')
+        print(f"{len(particoes)} partições {acao}: {', '.join(particoes) or '-'}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        async with engine.begin() as conn:
+            await _executar(conn, args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    comandos.add_parser('listar', help='partições de atletas e linhas estimadas')
+    criar_parser = comandos.add_parser('criar', help='cria as partições mensais dos próximos meses')
+    criar_parser.add_argument(
+        '--meses', type=int, default=settings.ATLETAS_PARTITIONS_AHEAD, help='meses à frente do atual'
+    )
+    arquivar_parser = comandos.add_parser('arquivar', help='desanexa as partições mensais antigas')
+    arquivar_parser.add_argument(
+        '--antes', type=date.fromisoformat, required=True, help='data (AAAA-MM-DD) limite dos meses arquivados'
+    )
+    arquivar_parser.add_argument('--schema', default='arquivo', help='schema que recebe as partições desanexadas')
+    arquivar_parser.add_argument('--drop', action='store_true', help='exclui as partições em vez de movê-las')
+    arquivar_parser.add_argument('--dry-run', action='store_true', help='só lista as partições que seriam arquivadas')
+    asyncio.run(main(parser.parse_args()))
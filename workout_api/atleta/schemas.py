@@ -1,4 +1,5 @@
-from typing import Annotated, Optional
+from datetime import datetime
+from typing import Annotated, Dict, List, Optional
 from pydantic import Field, PositiveFloat
 from workout_api.contrib.schemas import BaseSchema, OutMixin
 from workout_api.categorias.schemas import CategoriaOut
@@ -22,9 +23,6 @@ class AtletaOut(AtletaBase, OutMixin):
     categoria: CategoriaOut
     centro_treinamento: CentroTreinamentoOut
 
-    class Config:
-        orm_mode = True
-
 class AtletaUpdate(BaseSchema):
     nome: Annotated[Optional[str], Field(None, description='Nome do atleta', example='Joao', max_length=50)]
     idade: Annotated[Optional[int], Field(None, description='Idade do atleta', example=25)]
@@ -33,3 +31,35 @@ class AtletaUpdate(BaseSchema):
     sexo: Annotated[Optional[str], Field(None, description='Sexo do atleta', example='M', max_length=1)]
     categoria_id: Annotated[Optional[int], Field(None, description='ID da categoria do atleta', example=1)]
     centro_treinamento_id: Annotated[Optional[int], Field(None, description='ID do centro de treinamento', example=1)]
+
+class AtletaBulkItem(BaseSchema):
+    linha: Annotated[int, Field(description='Posição do registro na importação (começa em 1)', example=1)]
+    cpf: Annotated[Optional[str], Field(None, description='CPF do registro', example='12345678900')]
+    pk_id: Annotated[Optional[int], Field(None, description='ID do atleta criado', example=1)]
+    erro: Annotated[Optional[str], Field(None, description='Motivo da rejeição do registro')]
+
+class AtletaBulkOut(BaseSchema):
+    criados: Annotated[int, Field(description='Quantidade de atletas criados', example=1)]
+    rejeitados: Annotated[int, Field(description='Quantidade de registros rejeitados', example=0)]
+    resultados: list[AtletaBulkItem]
+
+class AtletaBulkSelection(BaseSchema):
+    ids: Annotated[Optional[List[int]], Field(None, description='Ids dos atletas; combinados com os filtros da query', example=[1, 2])]
+
+class AtletaBulkUpdate(AtletaBulkSelection):
+    dados: Annotated[AtletaUpdate, Field(description='Campos aplicados a todos os atletas selecionados')]
+
+class AtletaBulkChangeOut(BaseSchema):
+    afetados: Annotated[int, Field(description='Quantidade de atletas alterados ou excluídos', example=2)]
+    ids: Annotated[Optional[List[int]], Field(
+        None, description='Com return_ids=true, os menores ids afetados (até BULK_RETURN_IDS_MAX)', example=[1, 2]
+    )]
+    dry_run: Annotated[bool, Field(description='Se verdadeiro, nada foi gravado; são os atletas que seriam afetados')]
+
+class AtletaStatsOut(BaseSchema):
+    total: Annotated[int, Field(description='Quantidade de atletas', example=120)]
+    idade_media: Annotated[Optional[float], Field(None, description='Idade média', example=27.4)]
+    peso_medio: Annotated[Optional[float], Field(None, description='Peso médio', example=74.2)]
+    altura_media: Annotated[Optional[float], Field(None, description='Altura média', example=1.74)]
+    por_sexo: Annotated[Dict[str, int], Field(description='Quantidade de atletas por sexo', example={'M': 70, 'F': 50})]
+    atualizado_em: Annotated[Optional[datetime], Field(None, description='Momento do último cálculo dos números')]
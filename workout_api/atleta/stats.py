@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Dict, Literal, Optional
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer, String, column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.sql import Select
+
+from workout_api.atleta.schemas import AtletaStatsOut
+from workout_api.configs.database import Database, engine
+from workout_api.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+StatsScope = Literal['total', 'categoria', 'centro_treinamento']
+
+# Chave do pg_try_advisory_xact_lock que impede dois workers de atualizar a view juntos
+REFRESH_LOCK_ID = 0x5747_0001
+
+
+def _stats_source(nome: str):
+    """Tabela `atletas_stats` e view `atletas_stats_mv` (migração 5e8a1c2d7f43) têm as mesmas colunas."""
+    return table(
+        nome,
+        column('escopo', String),
+        column('ref_id', Integer),
+        column('sexo', String),
+        column('quantidade', BigInteger),
+        column('soma_idade', BigInteger),
+        column('soma_peso', Float),
+        column('soma_altura', Float),
+        column('atualizado_em', DateTime),
+    )
+
+
+STATS_TABLE = _stats_source('atletas_stats')
+STATS_VIEW = _stats_source('atletas_stats_mv')
+
+
+def stats_query(escopo: StatsScope, ref_id: int = 0) -> Select:
+    """Linhas de `atletas_stats` (ou da view, no modo materialized) que compõem um escopo.
+
+    Não há linhas 'total' (migração d4c7a2e9f0b3): o total geral é a soma das
+    linhas por categoria, já que todo atleta tem exatamente uma categoria.
+    """
+    fonte = STATS_VIEW if settings.STATS_MODE == 'materialized' else STATS_TABLE
+    if escopo == 'total':
+        return select(fonte).where(fonte.c.escopo == 'categoria')
+    return select(fonte).where(fonte.c.escopo == escopo, fonte.c.ref_id == ref_id)
+
+
+async def read_stats(db_session: AsyncSession, escopo: StatsScope, ref_id: int = 0) -> AtletaStatsOut:
+    """Estatísticas de um escopo a partir dos totais pré-agregados.
+
+    Lê no máximo uma linha por sexo pela chave primária (uma por categoria e sexo
+    no escopo 'total'), então o custo não depende da quantidade de atletas;
+    médias são derivadas das somas.
+    """
+    linhas = (await db_session.execute(stats_query(escopo, ref_id))).all()
+
+    total = sum(linha.quantidade for linha in linhas)
+    if not total:
+        return AtletaStatsOut(
+            total=0, por_sexo={}, atualizado_em=max((linha.atualizado_em for linha in linhas), default=None)
+        )
+    por_sexo: Dict[str, int] = {}
+    for linha in linhas:
+        if linha.quantidade:
+            por_sexo[linha.sexo] = por_sexo.get(linha.sexo, 0) + linha.quantidade
+    return AtletaStatsOut(
+        total=total,
+        idade_media=round(sum(linha.soma_idade for linha in linhas) / total, 2),
+        peso_medio=round(sum(linha.soma_peso for linha in linhas) / total, 2),
+        altura_media=round(sum(linha.soma_altura for linha in linhas) / total, 2),
+        por_sexo=por_sexo,
+        atualizado_em=max(linha.atualizado_em for linha in linhas),
+    )
+
+
+async def refresh_stats_view(bind: AsyncEngine = engine) -> bool:
+    """Atualiza a view sem bloquear leituras; devolve False se outro worker já está atualizando."""
+    async with bind.begin() as conn:
+        adquirido = (await conn.execute(
+            text('SELECT pg_try_advisory_xact_lock(:id)'), {'id': REFRESH_LOCK_ID}
+        )).scalar()
+        if not adquirido:
+            return False
+        await conn.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY atletas_stats_mv'))
+    return True
+
+
+class StatsRefresher:
+    """Tarefa de fundo que atualiza a view de estatísticas no modo materialized."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, database: Database) -> None:
+        if database.config.STATS_MODE != 'materialized' or database.engine.dialect.name != 'postgresql':
+            return
+        self._task = asyncio.create_task(self._run(database.engine))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self, bind: AsyncEngine) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await refresh_stats_view(bind)
+            except Exception:
+                logger.warning('Falha ao atualizar atletas_stats_mv', exc_info=True)
+
+
+stats_refresher = StatsRefresher(settings.STATS_REFRESH_INTERVAL)
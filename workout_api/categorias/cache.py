@@ -0,0 +1,5 @@
+from workout_api.categorias.models import CategoriaModel
+from workout_api.categorias.schemas import CategoriaOut
+from workout_api.contrib.cache import ReferenceCache
+
+categoria_cache: ReferenceCache[CategoriaOut] = ReferenceCache(CategoriaModel, CategoriaOut)
@@ -1,18 +1,27 @@
-from typing import Optional
-from fastapi import APIRouter, Body, HTTPException, status, Query, Depends
+from typing import Optional, Union
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status, Query, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func  # IMPORTAÇÃO ESSENCIAL PARA O count()
 
-from fastapi_pagination import Page, Params, add_pagination
+from fastapi_pagination import Params, add_pagination
 
 from workout_api.categorias.schemas import CategoriaIn, CategoriaOut
 from workout_api.categorias.models import CategoriaModel
-from workout_api.configs.database import get_session
+from workout_api.categorias.cache import categoria_cache
+from workout_api.atleta.schemas import AtletaStatsOut
+from workout_api.atleta.stats import read_stats
+from workout_api.configs.database import get_read_session, get_session
+from workout_api.contrib.batch import BatchGetIn, BatchOut, unique_ids
+from workout_api.contrib.conditional import list_etag, make_etag, not_modified, set_validators
+from workout_api.contrib.pagination import CursorPage, CursorParams, Page, TotalQuery, paginate
+from workout_api.contrib.search import SearchQuery, apply_search
+from workout_api.contrib.serialization import Projection, orjson_page
 
 router = APIRouter()
 
+CATEGORIA_ROWS = Projection(CategoriaModel, CategoriaOut)
+
 @router.post(
     '/',
     summary='Criar uma nova categoria',
@@ -26,6 +35,7 @@ async def post(
     try:
         categoria_model = CategoriaModel(**categoria_in.model_dump())
         db_session.add(categoria_model)
+        await categoria_cache.invalidate(db_session)
         await db_session.commit()
         await db_session.refresh(categoria_model)
     except IntegrityError as e:
@@ -51,27 +61,56 @@ async def post(
 @router.get(
     '/',
     summary='Consultar todas as categorias com filtro e paginação',
-    response_model=Page[CategoriaOut]
+    response_model=Union[Page[CategoriaOut], CursorPage[CategoriaOut]]
 )
 async def query(
+    request: Request,
     nome: Optional[str] = Query(None, description="Filtrar por nome da categoria"),
+    search: SearchQuery = None,
     params: Params = Depends(),
-    db_session: AsyncSession = Depends(get_session)
+    cursor: CursorParams = Depends(),
+    total: TotalQuery = 'exact',
+    db_session: AsyncSession = Depends(get_read_session)
 ):
     query = select(CategoriaModel)
     if nome:
         query = query.filter(CategoriaModel.nome.ilike(f"%{nome}%"))
 
-    total_result = await db_session.execute(
-        select(func.count()).select_from(query.subquery())
+    rank = None
+    if search:
+        query, rank = apply_search(query, CategoriaModel.nome, search)
+
+    etag, total_count = await list_etag(
+        db_session, request, query, CategoriaModel.pk_id, counted=total == 'exact' and not cursor.enabled
     )
-    total_count = total_result.scalar_one()
+    if etag and (resposta := not_modified(request, etag)):
+        return resposta
 
-    offset = (params.page - 1) * params.size
-    result = await db_session.execute(query.offset(offset).limit(params.size))
-    items = result.scalars().all()
+    resposta = orjson_page(await paginate(
+        db_session, query, params, cursor,
+        sort_column=CategoriaModel.nome, pk_column=CategoriaModel.pk_id, projection=CATEGORIA_ROWS,
+        total=total, rank=rank, known_total=total_count
+    ))
+    if etag:
+        set_validators(resposta, etag)
+    return resposta
 
-    return Page.create(items=items, total=total_count, params=params)
+@router.post(
+    '/batch-get',
+    summary='Consultar várias categorias pelos ids',
+    status_code=status.HTTP_200_OK,
+    response_model=BatchOut[CategoriaOut]
+)
+async def batch_get(
+    batch_in: BatchGetIn = Body(...),
+    db_session: AsyncSession = Depends(get_read_session)
+):
+    ids = unique_ids(batch_in.ids)
+    encontrados = await categoria_cache.get_many(db_session, ids)
+    return BatchOut(
+        items=[encontrados[pk_id] for pk_id in ids if pk_id in encontrados],
+        missing=[pk_id for pk_id in ids if pk_id not in encontrados],
+    )
 
 @router.get(
     '/{pk_id}',
@@ -81,15 +120,39 @@ async def query(
 )
 async def get(
     pk_id: int,
-    db_session: AsyncSession = Depends(get_session)
+    request: Request,
+    response: Response,
+    db_session: AsyncSession = Depends(get_read_session)
 ):
-    result = await db_session.execute(select(CategoriaModel).filter_by(pk_id=pk_id))
-    categoria = result.scalars().first()
+    categoria = await categoria_cache.get(db_session, pk_id)
     if not categoria:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'Categoria não encontrada no id: {pk_id}'
         )
+
+    etag = make_etag(CategoriaModel.__tablename__, categoria.model_dump_json())
+    resposta = not_modified(request, etag)
+    if resposta:
+        return resposta
+    set_validators(response, etag)
     return categoria
 
+@router.get(
+    '/{pk_id}/stats',
+    summary='Estatísticas dos atletas de uma categoria',
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaStatsOut
+)
+async def stats(
+    pk_id: int,
+    db_session: AsyncSession = Depends(get_read_session)
+):
+    if not await categoria_cache.get(db_session, pk_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Categoria não encontrada no id: {pk_id}'
+        )
+    return await read_stats(db_session, 'categoria', pk_id)
+
 add_pagination(router)
@@ -10,6 +10,3 @@ class CategoriaIn(CategoriaBase):
 
 class CategoriaOut(CategoriaBase):
     pk_id: int
-
-    class Config:
-        orm_mode = True
@@ -1,18 +1,27 @@
-from typing import Optional
-from fastapi import APIRouter, Body, HTTPException, status, Query, Depends
+from typing import Optional, Union
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status, Query, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
 
-from fastapi_pagination import Page, Params, add_pagination
+from fastapi_pagination import Params, add_pagination
 
 from workout_api.centro_treinamento.schemas import CentroTreinamentoIn, CentroTreinamentoOut
 from workout_api.centro_treinamento.models import CentroTreinamentoModel
-from workout_api.configs.database import get_session
+from workout_api.centro_treinamento.cache import centro_treinamento_cache
+from workout_api.atleta.schemas import AtletaStatsOut
+from workout_api.atleta.stats import read_stats
+from workout_api.configs.database import get_read_session, get_session
+from workout_api.contrib.batch import BatchGetIn, BatchOut, unique_ids
+from workout_api.contrib.conditional import list_etag, make_etag, not_modified, set_validators
+from workout_api.contrib.pagination import CursorPage, CursorParams, Page, TotalQuery, paginate
+from workout_api.contrib.search import SearchQuery, apply_search
+from workout_api.contrib.serialization import Projection, orjson_page
 
 router = APIRouter()
 
+CENTRO_TREINAMENTO_ROWS = Projection(CentroTreinamentoModel, CentroTreinamentoOut)
+
 @router.post(
     '/',
     summary='Criar um novo centro de treinamento',
@@ -26,6 +35,7 @@ async def post(
     try:
         centro_model = CentroTreinamentoModel(**centro_in.model_dump())
         db_session.add(centro_model)
+        await centro_treinamento_cache.invalidate(db_session)
         await db_session.commit()
         await db_session.refresh(centro_model)
     except IntegrityError as e:
@@ -51,27 +61,56 @@ async def post(
 @router.get(
     '/',
     summary='Consultar todos os centros de treinamento com filtro e paginação',
-    response_model=Page[CentroTreinamentoOut]
+    response_model=Union[Page[CentroTreinamentoOut], CursorPage[CentroTreinamentoOut]]
 )
 async def query(
+    request: Request,
     nome: Optional[str] = Query(None, description="Filtrar por nome do centro de treinamento"),
+    search: SearchQuery = None,
     params: Params = Depends(),
-    db_session: AsyncSession = Depends(get_session)
+    cursor: CursorParams = Depends(),
+    total: TotalQuery = 'exact',
+    db_session: AsyncSession = Depends(get_read_session)
 ):
     query = select(CentroTreinamentoModel)
     if nome:
         query = query.filter(CentroTreinamentoModel.nome.ilike(f"%{nome}%"))
 
-    total_result = await db_session.execute(
-        select(func.count()).select_from(query.subquery())
+    rank = None
+    if search:
+        query, rank = apply_search(query, CentroTreinamentoModel.nome, search)
+
+    etag, total_count = await list_etag(
+        db_session, request, query, CentroTreinamentoModel.pk_id, counted=total == 'exact' and not cursor.enabled
     )
-    total_count = total_result.scalar_one()
+    if etag and (resposta := not_modified(request, etag)):
+        return resposta
 
-    offset = (params.page - 1) * params.size
-    result = await db_session.execute(query.offset(offset).limit(params.size))
-    items = result.scalars().all()
+    resposta = orjson_page(await paginate(
+        db_session, query, params, cursor,
+        sort_column=CentroTreinamentoModel.nome, pk_column=CentroTreinamentoModel.pk_id, projection=CENTRO_TREINAMENTO_ROWS,
+        total=total, rank=rank, known_total=total_count
+    ))
+    if etag:
+        set_validators(resposta, etag)
+    return resposta
 
-    return Page.create(items=items, total=total_count, params=params)
+@router.post(
+    '/batch-get',
+    summary='Consultar vários centros de treinamento pelos ids',
+    status_code=status.HTTP_200_OK,
+    response_model=BatchOut[CentroTreinamentoOut]
+)
+async def batch_get(
+    batch_in: BatchGetIn = Body(...),
+    db_session: AsyncSession = Depends(get_read_session)
+):
+    ids = unique_ids(batch_in.ids)
+    encontrados = await centro_treinamento_cache.get_many(db_session, ids)
+    return BatchOut(
+        items=[encontrados[pk_id] for pk_id in ids if pk_id in encontrados],
+        missing=[pk_id for pk_id in ids if pk_id not in encontrados],
+    )
 
 @router.get(
     '/{pk_id}',
@@ -81,14 +120,39 @@ async def query(
 )
 async def get(
     pk_id: int,
-    db_session: AsyncSession = Depends(get_session)
+    request: Request,
+    response: Response,
+    db_session: AsyncSession = Depends(get_read_session)
 ):
-    centro = (await db_session.execute(select(CentroTreinamentoModel).filter_by(pk_id=pk_id))).scalars().first()
+    centro = await centro_treinamento_cache.get(db_session, pk_id)
     if not centro:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'Centro de treinamento não encontrado no id: {pk_id}'
         )
+
+    etag = make_etag(CentroTreinamentoModel.__tablename__, centro.model_dump_json())
+    resposta = not_modified(request, etag)
+    if resposta:
+        return resposta
+    set_validators(response, etag)
     return centro
 
+@router.get(
+    '/{pk_id}/stats',
+    summary='Estatísticas dos atletas de um centro de treinamento',
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaStatsOut
+)
+async def stats(
+    pk_id: int,
+    db_session: AsyncSession = Depends(get_read_session)
+):
+    if not await centro_treinamento_cache.get(db_session, pk_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Centro de treinamento não encontrado no id: {pk_id}'
+        )
+    return await read_stats(db_session, 'centro_treinamento', pk_id)
+
 add_pagination(router)
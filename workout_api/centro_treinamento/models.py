@@ -12,5 +12,5 @@ class CentroTreinamentoModel(BaseModel):
 
     atletas: Mapped[list['AtletaModel']] = relationship(
         back_populates='centro_treinamento',
-        lazy='selectin'
+        lazy='raise'
     )
@@ -12,6 +12,3 @@ class CentroTreinamentoIn(CentroTreinamentoBase):
 
 class CentroTreinamentoOut(CentroTreinamentoBase):
     pk_id: int
-
-    class Config:
-        orm_mode = True
@@ -1,14 +1,299 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from workout_api.configs.settings import settings
+import asyncio
+import itertools
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
+from uuid import uuid4
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import Request
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql import Executable
 
-async_session = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+from workout_api.configs.settings import Settings, settings
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session() as session:
+logger = logging.getLogger(__name__)
+
+class PoolMetrics:
+    """Tempo de espera por conexões do pool e quantidade de timeouts."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, segundos: float) -> None:
+        self.checkouts += 1
+        self.wait_time_total += segundos
+        self.wait_time_max = max(self.wait_time_max, segundos)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    # Definido por engine_options numa subclasse: atributo de classe, para sobreviver
+    # ao recreate() do pool em engine.dispose()
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - inicio)
+
+
+def engine_options(config: Settings, metrics: PoolMetrics) -> Dict[str, Any]:
+    """Argumentos de `create_async_engine` derivados das configurações do pool e do asyncpg.
+
+    As esperas por conexão são somadas em `metrics`.
+    """
+    server_settings = {'application_name': config.DB_APPLICATION_NAME}
+    connect_args: Dict[str, Any] = {'server_settings': server_settings}
+
+    if config.DB_PGBOUNCER:
+        # Em modo transaction o PgBouncer troca a conexão do servidor entre
+        # transações: nada de cache de statements e nomes únicos para os preparados.
+        # Parâmetros de inicialização além de application_name costumam ser rejeitados,
+        # então statement_timeout e workout.stats_mode devem ser configurados no role
+        # (ALTER ROLE ... SET) ou no PgBouncer.
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f'__asyncpg_{uuid4()}__',
+        )
+    else:
+        connect_args['prepared_statement_cache_size'] = config.DB_STATEMENT_CACHE_SIZE
+        if config.DB_STATEMENT_TIMEOUT_MS:
+            server_settings['statement_timeout'] = str(config.DB_STATEMENT_TIMEOUT_MS)
+        # Lido pelos triggers de atletas_stats, que não fazem nada no modo materialized
+        server_settings['workout.stats_mode'] = config.STATS_MODE
+
+    return dict(
+        echo=False,
+        poolclass=type('InstrumentedPool', (InstrumentedPool,), {'metrics': metrics}),
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+async def _warm_connection(bind: AsyncEngine, statements: Sequence[Executable]) -> None:
+    async with bind.connect() as conn:
+        conn = await conn.execution_options(isolation_level='AUTOCOMMIT')
+        for statement in statements:
+            try:
+                await conn.execute(statement)
+            except Exception:
+                logger.warning('Falha ao preparar comando no aquecimento do pool', exc_info=True)
+
+
+async def warm_pool(
+    connections: int, statements: Sequence[Executable] = (), bind: Optional[AsyncEngine] = None
+) -> None:
+    """Abre `connections` conexões de `bind` (padrão: o primário) ao mesmo tempo e executa `statements` em cada uma.
+
+    A primeira requisição de cada conexão não paga o connect/autenticação nem o
+    PREPARE dos comandos, que ficam no cache de prepared statements do asyncpg
+    (por conexão). Falhas são registradas e não impedem a inicialização.
+    """
+    try:
+        await asyncio.gather(*(_warm_connection(bind or engine, statements) for _ in range(connections)))
+    except Exception:
+        logger.warning('Falha ao aquecer o pool de conexões', exc_info=True)
+
+
+class QueryStats:
+    """Comandos SQL de uma requisição: quantidade, tempo no banco, linhas e repetições."""
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duracao: float, rows: int) -> None:
+        self.statements += 1
+        self.db_time += duracao
+        self.rows += max(rows, 0)
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Comandos idênticos (mesmo SQL, parâmetros diferentes) executados `threshold` vezes ou mais."""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if query_stats.get() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    if stats is not None and conn.info.get('query_start'):
+        stats.record(statement, time.perf_counter() - conn.info['query_start'].pop(), cursor.rowcount)
+
+
+def _discard_query_start(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start'):
+        conn.info['query_start'].pop()
+
+
+class RequestWrites:
+    """Marca, durante uma requisição, se alguma sessão do primário fez commit."""
+
+    def __init__(self):
+        self.committed = False
+
+
+request_writes: ContextVar[Optional[RequestWrites]] = ContextVar('request_writes', default=None)
+
+
+class PrimarySession(Session):
+    pass
+
+
+@event.listens_for(PrimarySession, 'after_commit')
+def _mark_write(session):
+    writes = request_writes.get()
+    if writes is not None:
+        writes.committed = True
+
+
+class ReplicaRouter:
+    """Escolhe o banco de cada sessão de leitura: uma réplica, em round robin ou a
+    com menos conexões em uso neste worker, ou o primário quando não há réplicas."""
+
+    def __init__(self, primary: AsyncEngine, engines: Sequence[AsyncEngine], strategy: str):
+        self._primary = primary
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.reads = [0] * len(self.engines)
+        self.primary_reads = 0
+        self._round_robin = itertools.count()
+
+    def choose(self) -> AsyncEngine:
+        if not self.engines:
+            self.primary_reads += 1
+            return self._primary
+        if self.strategy == 'least_connections':
+            indice = min(range(len(self.engines)), key=lambda i: self.engines[i].sync_engine.pool.checkedout())
+        else:
+            indice = next(self._round_robin) % len(self.engines)
+        self.reads[indice] += 1
+        return self.engines[indice]
+
+    def primary(self) -> AsyncEngine:
+        self.primary_reads += 1
+        return self._primary
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'url': replica.url.render_as_string(hide_password=True),
+                'reads': self.reads[i],
+                'checked_out': replica.sync_engine.pool.checkedout(),
+                'size': replica.sync_engine.pool.size(),
+            }
+            for i, replica in enumerate(self.engines)
+        ]
+
+
+class Database:
+    """Primário, réplicas, fábricas de sessão e roteamento de leituras de uma configuração.
+
+    `create_async_engine` não abre conexões: elas são abertas por `warm` na
+    inicialização do app (ou no primeiro uso) e fechadas por `dispose`.
+    """
+
+    def __init__(self, config: Settings):
+        self.config = config
+        # Primário e réplicas somam as esperas juntos, como em GET /metrics/pool
+        self.pool_metrics = PoolMetrics()
+        self.engine = create_async_engine(config.DATABASE_URL, **engine_options(config, self.pool_metrics))
+        self.replica_engines = [
+            create_async_engine(url, **engine_options(config, self.pool_metrics)) for url in config.replica_urls
+        ]
+        for bind in (self.engine, *self.replica_engines):
+            event.listen(bind.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(bind.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(bind.sync_engine, 'handle_error', _discard_query_start)
+
+        self.async_session = sessionmaker(
+            self.engine, class_=AsyncSession, sync_session_class=PrimarySession, expire_on_commit=False
+        )
+        self.read_session = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+        self.replica_router = ReplicaRouter(self.engine, self.replica_engines, config.DB_REPLICA_SELECTION)
+
+    async def warm(self, statements: Sequence[Executable] = ()) -> None:
+        """`warm_pool` com DB_POOL_SIZE conexões no primário e em cada réplica."""
+        if self.config.DB_PGBOUNCER:
+            # Sem cache de prepared statements no modo PgBouncer: só abre as conexões
+            statements = ()
+        for bind in (self.engine, *self.replica_engines):
+            await warm_pool(self.config.DB_POOL_SIZE, statements, bind=bind)
+
+    def pool_status(self) -> Dict[str, Any]:
+        pool = self.engine.sync_engine.pool
+        return {
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'checkouts': self.pool_metrics.checkouts,
+            'wait_time_total': self.pool_metrics.wait_time_total,
+            'wait_time_max': self.pool_metrics.wait_time_max,
+            'timeouts': self.pool_metrics.timeouts,
+        }
+
+    async def dispose(self) -> None:
+        for replica in self.replica_engines:
+            await replica.dispose()
+        await self.engine.dispose()
+
+
+# O banco das variáveis de ambiente: o do app padrão, dos scripts de manutenção e
+# dos benchmarks. `create_app(config)` cria outro para configurações diferentes.
+database = Database(settings)
+engine = database.engine
+replica_engines = database.replica_engines
+async_session = database.async_session
+
+PRIMARY_COOKIE = 'workout_primary_until'
+
+
+def recent_write(request: Request) -> bool:
+    """Se o cliente escreveu há menos de `DB_READ_YOUR_WRITES_WINDOW` segundos (cookie do
+    `ReadYourWritesMiddleware`); nesse caso as leituras dele vão para o primário."""
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Sessão no primário do `Database` do app (`create_app`)."""
+    async with request.app.state.database.async_session() as session:
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Sessão para endpoints somente leitura: numa réplica, exceto logo depois de uma escrita do cliente."""
+    db: Database = request.app.state.database
+    bind = db.replica_router.primary() if recent_write(request) else db.replica_router.choose()
+    async with db.read_session(bind=bind) as session:
         yield session
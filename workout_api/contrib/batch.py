@@ -0,0 +1,63 @@
+from typing import Annotated, Any, Dict, Generic, List, Sequence, TypeVar
+
+from pydantic import BaseModel, Field
+from sqlalchemy import ARRAY, ColumnElement, Integer, any_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+from workout_api.configs.settings import settings
+from workout_api.contrib.schemas import BaseSchema
+from workout_api.contrib.serialization import Projection
+
+T = TypeVar('T')
+
+
+class BatchGetIn(BaseSchema):
+    ids: Annotated[
+        List[int],
+        Field(
+            description='Ids a buscar; a resposta segue esta ordem',
+            example=[3, 1, 2],
+            min_length=1,
+            max_length=settings.BATCH_GET_MAX_IDS,
+        )
+    ]
+
+
+class BatchOut(BaseModel, Generic[T]):
+    items: Sequence[T]
+    missing: List[int]
+
+
+def unique_ids(ids: Sequence[int]) -> List[int]:
+    """Ids sem repetição, na ordem da primeira ocorrência."""
+    return list(dict.fromkeys(ids))
+
+
+def match_ids(db_session: AsyncSession, pk_column: InstrumentedAttribute, ids: Sequence[int]) -> ColumnElement:
+    """`pk = ANY(:ids)` no PostgreSQL: um único parâmetro array, então o prepared
+    statement é o mesmo para qualquer quantidade de ids (IN expande um por id)."""
+    if db_session.bind.dialect.name == 'postgresql':
+        return pk_column == any_(bindparam('ids', list(ids), type_=ARRAY(Integer)))
+    return pk_column.in_(ids)
+
+
+async def batch_get(
+    db_session: AsyncSession,
+    query: Select,
+    pk_column: InstrumentedAttribute,
+    projection: Projection,
+    ids: Sequence[int],
+) -> Dict[str, Any]:
+    """Busca `ids` com uma consulta e devolve os itens na ordem pedida e os não encontrados."""
+    ids = unique_ids(ids)
+    linhas = (await db_session.execute(
+        projection.apply(query.where(match_ids(db_session, pk_column, ids)))
+    )).all()
+
+    por_id = {getattr(linha, pk_column.key): projection.build(linha) for linha in linhas}
+    return {
+        'items': [por_id[pk_id] for pk_id in ids if pk_id in por_id],
+        'missing': [pk_id for pk_id in ids if pk_id not in por_id],
+    }
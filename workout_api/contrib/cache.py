@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel as PydanticModel
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from workout_api.configs.settings import settings
+from workout_api.contrib.batch import match_ids
+from workout_api.contrib.models import BaseModel
+
+logger = logging.getLogger(__name__)
+
+S = TypeVar('S', bound=PydanticModel)
+
+
+class LRUCache:
+    """Cache LRU limitado por tamanho, com TTL por entrada e contadores de acerto."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, tuple[float, Any]]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class ReferenceCache(Generic[S]):
+    """Leitura com cache de tabelas pequenas de referência (categorias, centros).
+
+    Guarda o schema de saída (não o objeto ORM, que pertence a uma sessão), indexado
+    por `pk_id` e por `nome`. Escritas chamam `invalidate`, que limpa o cache local
+    e avisa os outros workers por NOTIFY.
+    """
+
+    registry: Dict[str, 'ReferenceCache'] = {}
+
+    def __init__(self, model: Type[BaseModel], schema: Type[S]):
+        self.model = model
+        self.schema = schema
+        self.table = model.__tablename__
+        self.cache = LRUCache(settings.REFERENCE_CACHE_SIZE, settings.REFERENCE_CACHE_TTL)
+        ReferenceCache.registry[self.table] = self
+
+    def _store(self, item: S) -> S:
+        self.cache.set(('pk_id', item.pk_id), item)
+        self.cache.set(('nome', item.nome), item)
+        return item
+
+    async def _load(self, db_session: AsyncSession, **filtro: Any) -> Optional[S]:
+        instance = (await db_session.execute(
+            select(self.model).filter_by(**filtro))
+        ).scalars().first()
+        return self._store(self.schema.model_validate(instance)) if instance else None
+
+    async def get(self, db_session: AsyncSession, pk_id: int) -> Optional[S]:
+        item = self.cache.get(('pk_id', pk_id))
+        return item if item is not None else await self._load(db_session, pk_id=pk_id)
+
+    async def get_by_nome(self, db_session: AsyncSession, nome: str) -> Optional[S]:
+        item = self.cache.get(('nome', nome))
+        return item if item is not None else await self._load(db_session, nome=nome)
+
+    async def get_many(self, db_session: AsyncSession, ids: Iterable[int]) -> Dict[int, S]:
+        """Resolve vários ids, buscando os que faltam no cache em uma única consulta."""
+        encontrados: Dict[int, S] = {}
+        faltando = set()
+        for pk_id in set(ids):
+            item = self.cache.get(('pk_id', pk_id))
+            if item is None:
+                faltando.add(pk_id)
+            else:
+                encontrados[pk_id] = item
+
+        if faltando:
+            instances = (await db_session.execute(
+                select(self.model).where(match_ids(db_session, self.model.pk_id, faltando)))
+            ).scalars()
+            for instance in instances:
+                encontrados[instance.pk_id] = self._store(self.schema.model_validate(instance))
+        return encontrados
+
+    async def invalidate(self, db_session: AsyncSession) -> None:
+        """Limpa o cache local e agenda o NOTIFY, entregue quando a transação confirmar."""
+        self.cache.clear()
+        if db_session.bind.dialect.name == 'postgresql':
+            await db_session.execute(
+                text('SELECT pg_notify(:canal, :tabela)'),
+                {'canal': settings.CACHE_NOTIFY_CHANNEL, 'tabela': self.table}
+            )
+
+
+class CacheInvalidationListener:
+    """Conexão dedicada que escuta o canal de invalidação (LISTEN/NOTIFY) do worker."""
+
+    RECONNECT_DELAY = 5.0
+
+    def __init__(self, database_url: str, channel: str):
+        self.database_url = database_url
+        self.channel = channel
+        self._connection = None
+        self._stopping = False
+        self._handlers: List[Callable[[str], None]] = []
+
+    def subscribe(self, handler: Callable[[str], None]) -> None:
+        """Chama `handler(tabela)` a cada notificação, além de limpar o cache da tabela."""
+        self._handlers.append(handler)
+
+    async def start(self, database_url: Optional[str] = None) -> None:
+        """Conecta e escuta o canal; `database_url` troca o banco (o do app, em `create_app`)."""
+        if database_url is not None:
+            self.database_url = database_url
+        url = make_url(self.database_url)
+        if not url.drivername.startswith('postgresql'):
+            return
+
+        import asyncpg
+
+        self._stopping = False
+        try:
+            self._connection = await asyncpg.connect(
+                url.set(drivername='postgresql').render_as_string(hide_password=False)
+            )
+            await self._connection.add_listener(self.channel, self._on_notify)
+            self._connection.add_termination_listener(self._on_termination)
+        except Exception:
+            logger.warning(
+                'Não foi possível escutar %s; caches de referência dependem só do TTL',
+                self.channel, exc_info=True
+            )
+            self._connection = None
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, tabela: str) -> None:
+        cache = ReferenceCache.registry.get(tabela)
+        if cache is not None:
+            cache.cache.clear()
+        for handler in self._handlers:
+            handler(tabela)
+
+    def _on_termination(self, connection: Any) -> None:
+        # Notificações perdidas enquanto a conexão estava fora: descarta tudo
+        for cache in ReferenceCache.registry.values():
+            cache.cache.clear()
+        self._connection = None
+        if not self._stopping:
+            asyncio.get_running_loop().call_later(
+                self.RECONNECT_DELAY, lambda: asyncio.ensure_future(self.start())
+            )
+
+
+cache_listener = CacheInvalidationListener(settings.DATABASE_URL, settings.CACHE_NOTIFY_CHANNEL)
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {tabela: cache.cache.stats() for tabela, cache in ReferenceCache.registry.items()}
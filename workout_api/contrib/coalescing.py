@@ -0,0 +1,178 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Pattern, Sequence, Tuple
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.database import recent_write
+from workout_api.configs.settings import settings
+from workout_api.contrib.cache import LRUCache, cache_listener
+from workout_api.contrib.compression import choose_encoding
+from workout_api.contrib.singleflight import SingleFlight
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class CapturedResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    route: Any
+
+    async def replay(self, send: Send) -> None:
+        await send({'type': 'http.response.start', 'status': self.status, 'headers': self.headers})
+        await send({'type': 'http.response.body', 'body': self.body})
+
+
+class RequestCoalescer:
+    """Estado da coalescência: execuções em andamento, respostas recentes e contadores por rota.
+
+    Cada tabela tem uma geração, que entra na chave das leituras que dependem
+    dela; uma escrita incrementa a geração, então quem chega depois não reaproveita
+    nem a execução em andamento nem a resposta guardada de antes da escrita.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.flight: SingleFlight[CapturedResponse] = SingleFlight()
+        self.recentes = LRUCache(max_size, ttl)
+        self.generations: Counter = Counter()
+        self.executadas: Counter = Counter()
+        self.compartilhadas: Counter = Counter()
+        self.repetidas: Counter = Counter()
+        self.invalidacoes: Counter = Counter()
+
+    def invalidate(self, table: str) -> None:
+        self.generations[table] += 1
+        self.invalidacoes[table] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        rotas = set(self.executadas) | set(self.compartilhadas) | set(self.repetidas)
+        return {
+            'routes': {
+                rota: {
+                    'executed': self.executadas[rota],
+                    'shared': self.compartilhadas[rota],
+                    'ttl_hits': self.repetidas[rota],
+                }
+                for rota in sorted(rotas)
+            },
+            'invalidations': dict(self.invalidacoes),
+            'in_flight': self.flight.stats()['in_flight'],
+            'cached': self.recentes.stats()['size'],
+        }
+
+
+request_coalescer = RequestCoalescer(settings.COALESCE_TTL, settings.COALESCE_CACHE_SIZE)
+# Escritas em categorias e centros feitas por outros workers chegam pelo NOTIFY do cache
+cache_listener.subscribe(request_coalescer.invalidate)
+
+
+class CoalescingMiddleware:
+    """Requisições GET idênticas e simultâneas às rotas de `reads` executam uma só vez.
+
+    `reads` associa um padrão de caminho às tabelas das quais a resposta depende e
+    `writes` associa o prefixo das rotas de escrita à tabela escrita. A chave
+    inclui o caminho, os parâmetros da query em ordem, `If-None-Match`,
+    `If-Modified-Since`, a codificação negociada e se o cliente está preso ao primário (read-your-writes).
+    A primeira requisição executa a rota; as outras recebem o mesmo status,
+    cabeçalhos e corpo já serializado. Com `COALESCE_TTL`, respostas sem erro
+    (exceto 304) também servem as repetições pelos segundos seguintes. Uma escrita bem-sucedida
+    invalida as leituras das tabelas afetadas neste worker.
+    """
+
+    def __init__(self, app: ASGIApp, reads: Mapping[str, Sequence[str]], writes: Mapping[str, str]):
+        self.app = app
+        self.reads: List[Tuple[Pattern, Tuple[str, ...]]] = [
+            (re.compile(padrao), tuple(tabelas)) for padrao, tabelas in reads.items()
+        ]
+        self.writes = dict(writes)
+        self.coalescer = request_coalescer
+
+    def _tabelas(self, path: str) -> Optional[Tuple[str, ...]]:
+        for padrao, tabelas in self.reads:
+            if padrao.fullmatch(path):
+                return tabelas
+        return None
+
+    def _escrita(self, path: str) -> Optional[str]:
+        for prefixo, tabela in self.writes.items():
+            if path.startswith(prefixo):
+                return tabela
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        if scope['method'] not in SAFE_METHODS:
+            tabela = self._escrita(scope['path'])
+            if tabela is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_invalidating(message: Message) -> None:
+                # O commit já aconteceu quando a resposta começa a ser enviada
+                if message['type'] == 'http.response.start' and message['status'] < 400:
+                    self.coalescer.invalidate(tabela)
+                await send(message)
+
+            await self.app(scope, receive, send_invalidating)
+            return
+
+        tabelas = self._tabelas(scope['path'])
+        if scope['method'] != 'GET' or tabelas is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = (
+            scope['path'],
+            tuple(sorted(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))),
+            headers.get('if-none-match'),
+            headers.get('if-modified-since'),
+            choose_encoding(headers.get('accept-encoding', '')),
+            recent_write(Request(scope)),
+            tuple(self.coalescer.generations[tabela] for tabela in tabelas),
+        )
+        rota = scope['path']
+
+        async def executar() -> CapturedResponse:
+            inicio: Dict[str, Any] = {}
+            partes: List[bytes] = []
+
+            async def capture(message: Message) -> None:
+                if message['type'] == 'http.response.start':
+                    inicio.update(message)
+                elif message['type'] == 'http.response.body':
+                    partes.append(message.get('body', b''))
+
+            await self.app(scope, receive, capture)
+            return CapturedResponse(inicio['status'], list(inicio.get('headers', [])), b''.join(partes), scope.get('route'))
+
+        resposta = self.coalescer.recentes.get(key)
+        if resposta is not None:
+            self.coalescer.repetidas[_rota(resposta, rota)] += 1
+        else:
+            resposta, compartilhada = await self.coalescer.flight.run(key, executar)
+            if compartilhada:
+                self.coalescer.compartilhadas[_rota(resposta, rota)] += 1
+            else:
+                self.coalescer.executadas[_rota(resposta, rota)] += 1
+                # Um 304 só vale para quem mandou os mesmos validadores, que já estão na chave
+                if resposta.status < 400 and resposta.status != 304:
+                    self.coalescer.recentes.set(key, resposta)
+
+        if resposta.route is not None:
+            # Para a instrumentação agrupar pela rota declarada, como na execução original
+            scope['route'] = resposta.route
+        await resposta.replay(send)
+
+
+def _rota(resposta: CapturedResponse, path: str) -> str:
+    return getattr(resposta.route, 'path', path)
@@ -0,0 +1,127 @@
+import zlib
+from typing import Any, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.settings import settings
+
+try:
+    import brotli
+except ImportError:  # sem o pacote brotli, só gzip é oferecido
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Codificação preferida pelo cliente entre br e gzip (q=0 recusa), ou None."""
+    aceitas = {}
+    for parte in accept_encoding.split(','):
+        nome, _, parametros = parte.strip().partition(';')
+        q = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith('q='):
+            try:
+                q = float(parametro[2:])
+            except ValueError:
+                q = 0.0
+        aceitas[nome.strip().lower()] = q
+
+    def qualidade(nome: str) -> float:
+        return aceitas.get(nome, aceitas.get('*', 0.0))
+
+    candidatas = [nome for nome in ('br', 'gzip') if qualidade(nome) > 0 and (nome != 'br' or brotli)]
+    return max(candidatas, key=qualidade) if candidatas else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == 'br':
+            self._obj: Any = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._compress, self._finish = self._obj.process, self._obj.finish
+        else:
+            self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress, self._finish = self._obj.compress, self._obj.flush
+
+    def compress(self, dados: bytes) -> bytes:
+        return self._compress(dados)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """Compressão gzip/brotli negociada por `Accept-Encoding`, em ASGI puro.
+
+    Respostas completas menores que `COMPRESSION_MIN_SIZE` bytes, sem tipo
+    compressível ou já codificadas passam intactas. Respostas em streaming
+    (exportação) são comprimidas por partes, sem acumular o corpo. Um ETag forte
+    vira fraco, pois o corpo enviado deixa de ser o mesmo byte a byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        repassar = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal inicio, compressor, repassar
+            if message['type'] == 'http.response.start':
+                inicio = message
+                return
+            if message['type'] != 'http.response.body' or repassar:
+                await send(message)
+                return
+
+            corpo = message.get('body', b'')
+            mais = message.get('more_body', False)
+
+            if compressor is None:
+                headers = Headers(raw=inicio['headers'])
+                tipo = headers.get('content-type', '').split(';')[0].strip()
+                if (
+                    'content-encoding' in headers
+                    or tipo not in COMPRESSIBLE_TYPES
+                    or (not mais and len(corpo) < settings.COMPRESSION_MIN_SIZE)
+                ):
+                    repassar = True
+                    await send(inicio)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                headers = MutableHeaders(scope=inicio)
+                headers['Content-Encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                etag = headers.get('etag')
+                if etag and not etag.startswith('W/'):
+                    headers['ETag'] = f'W/{etag}'
+                del headers['Content-Length']
+                if not mais:
+                    corpo = compressor.compress(corpo) + compressor.finish()
+                    headers['Content-Length'] = str(len(corpo))
+                    await send(inicio)
+                    await send({'type': 'http.response.body', 'body': corpo})
+                    return
+                await send(inicio)
+
+            corpo = compressor.compress(corpo)
+            if not mais:
+                corpo += compressor.finish()
+            if corpo or not mais:
+                await send({'type': 'http.response.body', 'body': corpo, 'more_body': mais})
+
+        await self.app(scope, receive, send_compressed)
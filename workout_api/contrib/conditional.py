@@ -0,0 +1,95 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+from workout_api.contrib.count import count_version
+
+
+def make_etag(*partes: Any) -> str:
+    """ETag forte a partir dos dados de versão do recurso."""
+    digest = hashlib.sha256('|'.join(str(parte) for parte in partes).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def http_date(valor: datetime) -> str:
+    # As datas do banco são UTC sem fuso (datetime.utcnow)
+    return format_datetime(valor.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def is_conditional(request: Request) -> bool:
+    return 'if-none-match' in request.headers or 'if-modified-since' in request.headers
+
+
+def not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Retorna a resposta 304 quando o cliente já tem a versão atual, ou None.
+
+    Segue a RFC 9110: `If-None-Match` tem precedência e `If-Modified-Since` só é
+    considerado quando ele não foi enviado.
+    """
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        # Comparação fraca (RFC 9110): a compressão envia o ETag como W/"..."
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        if '*' in tags or etag in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return None
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            desde = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if desde.tzinfo is None:
+            desde = desde.replace(tzinfo=timezone.utc)
+        if last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= desde:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+
+
+async def list_etag(
+    db_session: AsyncSession,
+    request: Request,
+    query: Select,
+    version_column: InstrumentedAttribute,
+    counted: bool
+) -> Tuple[Optional[str], Optional[int]]:
+    """ETag de uma listagem (parâmetros + COUNT e MAX da coluna de versão) e o COUNT.
+
+    Só consulta o banco em requisições condicionais, que recebem o 304 antes da
+    página ser buscada, ou quando a página vai precisar do total exato
+    (`counted`), que então sai da mesma consulta. Nos outros casos (cursor,
+    `total=estimate|none`) a listagem sai sem ETag.
+    Para tabelas sem UPDATE pela API (categorias, centros) a chave serial serve
+    de versão; para atletas, `updated_at`.
+    """
+    if not counted and not is_conditional(request):
+        return None, None
+    total, versao = await count_version(db_session, query, version_column)
+    etag = make_etag(
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        total,
+        versao.isoformat() if isinstance(versao, datetime) else versao
+    )
+    return etag, total
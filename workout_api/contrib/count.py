@@ -0,0 +1,157 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, FrozenSet, Hashable, Literal, Optional, Tuple
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.util import find_tables
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from workout_api.configs.settings import settings
+
+TotalMode = Literal['exact', 'estimate', 'none']
+
+
+class CountCache:
+    """Cache de totais com TTL curto, invalidado por escrita nas tabelas envolvidas."""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Hashable, Tuple[float, int, FrozenSet[str]]]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, total, _ = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return total
+
+    def set(self, key: Hashable, total: Any, tables: FrozenSet[str]) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, total, tables)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, table: str) -> None:
+        for key in [k for k, (_, _, tables) in self._entries.items() if table in tables]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+count_cache = CountCache(ttl=settings.COUNT_CACHE_TTL, max_size=settings.COUNT_CACHE_SIZE)
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_after_flush(session: Session, flush_context: Any) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, '__tablename__', None)
+        if table:
+            count_cache.invalidate(table)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_on_dml(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        count_cache.invalidate(orm_execute_state.statement.table.name)
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, 'postgresql')
+def _compile_explain(element: _Explain, compiler: Any, **kw: Any) -> str:
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+async def _estimate(db_session: AsyncSession, query: Select) -> int:
+    froms = query.get_final_froms()
+    if query.whereclause is None and len(froms) == 1 and hasattr(froms[0], 'name'):
+        reltuples = (await db_session.execute(
+            text('SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:tabela AS regclass)'),
+            {'tabela': froms[0].name}
+        )).scalar()
+        if reltuples is not None and reltuples >= 0:
+            return reltuples
+
+    plan = (await db_session.execute(_Explain(query))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _cache_key(db_session: AsyncSession, mode: str, query: Select) -> Hashable:
+    compiled = query.compile(dialect=db_session.bind.dialect)
+    params = tuple(sorted((nome, repr(valor)) for nome, valor in compiled.params.items()))
+    # O banco entra na chave: apps de `create_app(config)` no mesmo processo não dividem totais
+    return db_session.bind.url.render_as_string(), mode, str(compiled), params
+
+
+async def count_total(
+    db_session: AsyncSession,
+    query: Select,
+    mode: TotalMode = 'exact'
+) -> Optional[int]:
+    """Total de linhas de `query` conforme o modo pedido pelo cliente.
+
+    `exact` executa o COUNT(*), `estimate` usa as estatísticas do planner
+    (`pg_class.reltuples` sem filtros, `EXPLAIN` com filtros) e `none` não consulta
+    o banco. Os modos `exact` e `estimate` passam pelo `count_cache`.
+    """
+    if mode == 'none':
+        return None
+
+    key = _cache_key(db_session, mode, query)
+    total = count_cache.get(key)
+    if total is not None:
+        return total
+
+    if mode == 'estimate':
+        total = await _estimate(db_session, query)
+    else:
+        total = (await db_session.execute(
+            select(func.count()).select_from(query.subquery())
+        )).scalar_one()
+
+    count_cache.set(key, total, _tables(query))
+    return total
+
+
+def _tables(query: Select) -> FrozenSet[str]:
+    return frozenset(t.name for f in query.get_final_froms() for t in find_tables(f))
+
+
+async def count_version(
+    db_session: AsyncSession,
+    query: Select,
+    version_column: Any
+) -> Tuple[int, Any]:
+    """COUNT(*) e MAX de `version_column` de `query` numa só consulta, pelo `count_cache`.
+
+    É a versão de uma listagem: uma inserção muda o MAX, uma exclusão muda o COUNT.
+    """
+    key = _cache_key(db_session, 'version', query)
+    versao = count_cache.get(key)
+    if versao is not None:
+        return versao
+
+    versao = tuple((await db_session.execute(
+        query.with_only_columns(func.count(), func.max(version_column)).order_by(None)
+    )).one())
+    count_cache.set(key, versao, _tables(query))
+    return versao
@@ -3,6 +3,7 @@ from fastapi import Depends
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from workout_api.configs.database import get_session
+from workout_api.configs.database import get_read_session, get_session
 
-DatabaseDependency = Annotated[AsyncSession, Depends(get_session)]
\ No newline at end of file
+DatabaseDependency = Annotated[AsyncSession, Depends(get_session)]
+ReadDatabaseDependency = Annotated[AsyncSession, Depends(get_read_session)]
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import logging
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Awaitable, Callable, Optional, Tuple
+
+import orjson
+from fastapi import Header, HTTPException, Response, status
+from sqlalchemy import DateTime, Integer, LargeBinary, String, column, delete, select, table, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from workout_api.configs.database import Database, engine
+from workout_api.configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+IdempotencyKey = Annotated[
+    Optional[str],
+    Header(
+        alias='Idempotency-Key',
+        max_length=255,
+        description='Chave escolhida pelo cliente; repetições com a mesma chave devolvem a resposta original'
+    )
+]
+
+# Tabela da migração 8f2c4a6e1b97
+IDEMPOTENCY_TABLE = table(
+    'idempotency_keys',
+    column('key', String),
+    column('request_hash', String),
+    column('status_code', Integer),
+    column('body', LargeBinary),
+    column('created_at', DateTime),
+    column('expires_at', DateTime),
+)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """Resposta JSON já serializada, que pode ser entregue a mais de um cliente."""
+
+    status_code: int
+    body: bytes
+
+    def render(self, replayed: bool = False) -> Response:
+        return Response(
+            self.body,
+            status_code=self.status_code,
+            media_type='application/json',
+            headers={'Idempotent-Replayed': 'true'} if replayed else None,
+        )
+
+
+def request_hash(dados: Any) -> str:
+    return hashlib.sha256(orjson.dumps(dados, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+async def capture(executar: Callable[[], Awaitable[StoredResponse]]) -> StoredResponse:
+    """Converte erros do cliente (4xx) em resposta guardável; 5xx continuam como exceção."""
+    try:
+        return await executar()
+    except HTTPException as exc:
+        if exc.status_code >= 500:
+            raise
+        return StoredResponse(exc.status_code, orjson.dumps({'detail': exc.detail}))
+
+
+async def idempotent(
+    db_session: AsyncSession,
+    key: str,
+    hash_: str,
+    executar: Callable[[], Awaitable[StoredResponse]],
+) -> Tuple[StoredResponse, bool]:
+    """Executa `executar` uma vez por `key` e guarda a resposta por `IDEMPOTENCY_TTL`.
+
+    A chave é reservada antes da execução (INSERT ... ON CONFLICT, que também
+    reaproveita uma chave expirada), de modo que outro worker com a mesma chave
+    recebe 409 enquanto a primeira requisição não termina. Uma repetição devolve a
+    resposta guardada sem tocar nas tabelas do recurso; a mesma chave com outro
+    corpo é recusada com 422. Se `executar` falhar com erro de servidor, a reserva
+    é removida e a chave pode ser usada de novo.
+
+    Devolve a resposta e se ela é uma repetição.
+    """
+    agora = datetime.utcnow()
+    tabela = IDEMPOTENCY_TABLE
+    reserva = insert(tabela).values(
+        key=key, request_hash=hash_, created_at=agora,
+        expires_at=agora + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+    )
+    reserva = reserva.on_conflict_do_update(
+        index_elements=[tabela.c.key],
+        set_={
+            'request_hash': reserva.excluded.request_hash,
+            'status_code': None,
+            'body': None,
+            'created_at': reserva.excluded.created_at,
+            'expires_at': reserva.excluded.expires_at,
+        },
+        where=tabela.c.expires_at < agora,
+    ).returning(tabela.c.key)
+    reservado = (await db_session.execute(reserva)).scalar_one_or_none()
+    await db_session.commit()
+
+    if reservado is None:
+        guardada = (await db_session.execute(
+            select(tabela.c.request_hash, tabela.c.status_code, tabela.c.body).where(tabela.c.key == key)
+        )).one_or_none()
+        if guardada is not None and guardada.request_hash != hash_:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail='Idempotency-Key já usada com outro corpo de requisição.'
+            )
+        if guardada is None or guardada.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail='Requisição com esta Idempotency-Key ainda em andamento.'
+            )
+        return StoredResponse(guardada.status_code, guardada.body), True
+
+    try:
+        resposta = await executar()
+    except BaseException:
+        with suppress(Exception):
+            await db_session.rollback()
+            await db_session.execute(delete(tabela).where(tabela.c.key == key))
+            await db_session.commit()
+        raise
+
+    await db_session.execute(
+        update(tabela).where(tabela.c.key == key).values(status_code=resposta.status_code, body=resposta.body)
+    )
+    await db_session.commit()
+    return resposta, False
+
+
+async def purge_expired(bind: AsyncEngine = engine) -> int:
+    async with bind.begin() as conn:
+        resultado = await conn.execute(
+            delete(IDEMPOTENCY_TABLE).where(IDEMPOTENCY_TABLE.c.expires_at < datetime.utcnow())
+        )
+    return resultado.rowcount
+
+
+class IdempotencyJanitor:
+    """Tarefa de fundo que remove as chaves de idempotência expiradas."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, database: Database) -> None:
+        if self.interval <= 0 or database.engine.dialect.name != 'postgresql':
+            return
+        self._task = asyncio.create_task(self._run(database.engine))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self, bind: AsyncEngine) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await purge_expired(bind)
+            except Exception:
+                logger.warning('Falha ao remover chaves de idempotência expiradas', exc_info=True)
+
+
+idempotency_janitor = IdempotencyJanitor(settings.IDEMPOTENCY_CLEANUP_INTERVAL)
@@ -0,0 +1,165 @@
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.database import Database, QueryStats, query_stats
+from workout_api.configs.settings import settings
+from workout_api.contrib.coalescing import request_coalescer
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass
+class RouteMetrics:
+    requests: int = 0
+    errors: int = 0
+    duration: float = 0.0
+    statements: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    n_plus_one: int = 0
+    budget_exceeded: int = 0
+
+
+class RequestMetrics:
+    """Totais acumulados por rota, expostos no formato de texto do Prometheus."""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def record(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duracao: float,
+        stats: QueryStats,
+        repetidos: int,
+        estourou: bool
+    ) -> None:
+        metrics = self.routes.setdefault((method, route), RouteMetrics())
+        metrics.requests += 1
+        metrics.errors += status_code >= 500
+        metrics.duration += duracao
+        metrics.statements += stats.statements
+        metrics.db_time += stats.db_time
+        metrics.rows += stats.rows
+        metrics.n_plus_one += repetidos > 0
+        metrics.budget_exceeded += estourou
+
+    def render(self, database: Database) -> str:
+        linhas: List[str] = []
+
+        def metrica(nome: str, tipo: str, ajuda: str, atributo: str) -> None:
+            linhas.append(f'# HELP {nome} {ajuda}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+            for (method, route), metrics in sorted(self.routes.items()):
+                linhas.append(f'{nome}{{method="{method}",route="{route}"}} {getattr(metrics, atributo)}')
+
+        metrica('workout_http_requests_total', 'counter', 'Requisições atendidas', 'requests')
+        metrica('workout_http_errors_total', 'counter', 'Requisições com status 5xx', 'errors')
+        metrica('workout_http_request_duration_seconds_total', 'counter', 'Tempo total das requisições', 'duration')
+        metrica('workout_sql_statements_total', 'counter', 'Comandos SQL executados', 'statements')
+        metrica('workout_sql_duration_seconds_total', 'counter', 'Tempo gasto no banco', 'db_time')
+        metrica('workout_sql_rows_total', 'counter', 'Linhas devolvidas ou afetadas', 'rows')
+        metrica('workout_sql_n_plus_one_total', 'counter', 'Requisições com comando repetido (suspeita de N+1)', 'n_plus_one')
+        metrica('workout_sql_budget_exceeded_total', 'counter', 'Requisições acima de SQL_QUERY_BUDGET', 'budget_exceeded')
+
+        for chave, valor in database.pool_status().items():
+            linhas.append(f'workout_db_pool_{chave} {valor}')
+        linhas.append(f'workout_db_primary_reads_total {database.replica_router.primary_reads}')
+        for replica in database.replica_router.status():
+            for chave in ('reads', 'checked_out', 'size'):
+                linhas.append(f'workout_db_replica_{chave}{{url="{replica["url"]}"}} {replica[chave]}')
+        for rota, contadores in request_coalescer.stats()['routes'].items():
+            for chave, valor in contadores.items():
+                linhas.append(f'workout_coalescing_{chave}_total{{route="{rota}"}} {valor}')
+        return '\n'.join(linhas) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+def _route_path(scope: Scope) -> str:
+    """Caminho declarado da rota (`/atletas/{pk_id}`), para não abrir uma série por id."""
+    return getattr(scope.get('route'), 'path', scope['path'])
+
+
+def _server_timing(stats: QueryStats, duracao: float) -> str:
+    return (
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} SQL", '
+        f'app;dur={duracao * 1000:.2f}'
+    )
+
+
+class QueryInstrumentationMiddleware:
+    """Mede os comandos SQL de cada requisição.
+
+    O resumo sai no cabeçalho `Server-Timing`, em um log JSON (DEBUG, ou WARNING
+    quando há suspeita de N+1 ou o orçamento `SQL_QUERY_BUDGET` é estourado) e nas
+    métricas de `/metrics`. Respostas em streaming levam no cabeçalho só o que foi
+    executado até o início do envio.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        inicio = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                MutableHeaders(scope=message).append(
+                    'Server-Timing', _server_timing(stats, time.perf_counter() - inicio)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            estourou = self._report(scope, status_code, time.perf_counter() - inicio, stats)
+
+        if estourou and settings.SQL_QUERY_BUDGET_MODE == 'raise':
+            raise QueryBudgetExceeded(
+                f"{scope['method']} {_route_path(scope)} executou {stats.statements} comandos SQL "
+                f'(orçamento: {settings.SQL_QUERY_BUDGET})'
+            )
+
+    def _report(self, scope: Scope, status_code: int, duracao: float, stats: QueryStats) -> bool:
+        path = _route_path(scope)
+        repetidos = stats.repeated(settings.SQL_REPEAT_THRESHOLD)
+        estourou = 0 < settings.SQL_QUERY_BUDGET < stats.statements
+        request_metrics.record(scope['method'], path, status_code, duracao, stats, len(repetidos), estourou)
+
+        registro = {
+            'method': scope['method'],
+            'route': path,
+            'status': status_code,
+            'duration_ms': round(duracao * 1000, 2),
+            'sql_statements': stats.statements,
+            'sql_time_ms': round(stats.db_time * 1000, 2),
+            'sql_rows': stats.rows,
+            'sql_repeated': repetidos,
+        }
+        nivel = logging.WARNING if repetidos or estourou else logging.DEBUG
+        logger.log(nivel, json.dumps(registro, ensure_ascii=False), extra={'sql': registro})
+        return estourou
@@ -0,0 +1,49 @@
+from typing import Tuple, Type
+
+from pydantic import BaseModel as PydanticModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from workout_api.contrib.models import BaseModel
+from workout_api.contrib.repository import models  # noqa: F401 - registra todos os modelos
+
+LoadingProfile = Tuple[LoaderOption, ...]
+
+
+def loading_profile(
+    model: Type[BaseModel],
+    schema: Type[PydanticModel],
+    *relationships: str
+) -> LoadingProfile:
+    """Monta as opções de carregamento que um endpoint declara para o seu schema de resposta.
+
+    Os relacionamentos dos modelos são `lazy='raise'`: só é carregado o que for
+    declarado aqui. A declaração precisa bater exatamente com os relacionamentos
+    serializados pelo schema, senão o módulo do controller falha ao ser importado.
+    """
+    mapper = inspect(model)
+    declarados = set(relationships)
+    serializados = {nome for nome in mapper.relationships.keys() if nome in schema.model_fields}
+
+    nao_serializados = declarados - serializados
+    if nao_serializados:
+        raise ValueError(
+            f'{schema.__name__} não serializa {sorted(nao_serializados)} de {model.__name__}'
+        )
+
+    nao_declarados = serializados - declarados
+    if nao_declarados:
+        raise ValueError(
+            f'{schema.__name__} serializa {sorted(nao_declarados)} de {model.__name__} '
+            f'sem declará-los no perfil de carregamento'
+        )
+
+    options = []
+    for nome in relationships:
+        atributo = getattr(model, nome)
+        if mapper.relationships[nome].uselist:
+            options.append(selectinload(atributo))
+        else:
+            options.append(joinedload(atributo, innerjoin=True))
+    return tuple(options)
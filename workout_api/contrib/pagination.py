@@ -0,0 +1,202 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Annotated, Any, Generic, Literal, Optional, Sequence, Tuple, TypeVar, Union
+
+from fastapi import HTTPException, Query, status
+import fastapi_pagination
+from fastapi_pagination import Params
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+from workout_api.contrib.count import TotalMode, count_total
+from workout_api.contrib.loading import LoadingProfile
+from workout_api.contrib.serialization import Projection
+
+T = TypeVar('T')
+
+TotalQuery = Annotated[
+    TotalMode,
+    Query(description='Total da listagem: exact (COUNT), estimate (estatísticas do planner) ou none')
+]
+
+
+class Page(fastapi_pagination.Page[T], Generic[T]):
+    total: Optional[int] = None
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: Sequence[T]
+    size: int
+    next_cursor: Optional[str] = None
+
+
+class CursorParams:
+    """Parâmetros do modo de paginação por cursor (keyset), opcional ao modo `Page`."""
+
+    def __init__(
+        self,
+        pagination: Literal['page', 'cursor'] = Query(
+            'page', description='Modo de paginação: page (offset) ou cursor (keyset)'
+        ),
+        after: Optional[str] = Query(
+            None, description='Cursor opaco retornado em next_cursor pela página anterior'
+        ),
+    ):
+        self.enabled = pagination == 'cursor' or after is not None
+        self.after = after
+
+
+def _sort_name(sort_column: InstrumentedAttribute, descending: bool) -> str:
+    return f'-{sort_column.key}' if descending else sort_column.key
+
+
+def _json_default(valor: Any) -> str:
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f'Valor não serializável no cursor: {valor!r}')
+
+
+def encode_cursor(
+    sort_column: InstrumentedAttribute,
+    sort_value: Any,
+    pk_value: int,
+    descending: bool = False
+) -> str:
+    payload = json.dumps(
+        [_sort_name(sort_column, descending), sort_value, pk_value],
+        default=_json_default,
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _sort_value(valor: Any, python_type: type) -> Any:
+    # O cursor vem do cliente: um tipo diferente do da coluna viraria DataError (500) no asyncpg
+    if valor is None:
+        return None
+    if python_type in (date, datetime):
+        if not isinstance(valor, str):
+            raise TypeError(valor)
+        return python_type.fromisoformat(valor)
+    if python_type is float and type(valor) is int:
+        return float(valor)
+    if type(valor) is not python_type:
+        raise TypeError(valor)
+    return valor
+
+
+def decode_cursor(
+    cursor: str,
+    sort_column: InstrumentedAttribute,
+    descending: bool = False
+) -> Tuple[Any, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_name, sort_value, pk_value = json.loads(payload)
+        if sort_name != _sort_name(sort_column, descending) or type(pk_value) is not int:
+            raise ValueError(sort_name)
+        sort_value = _sort_value(sort_value, sort_column.type.python_type)
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Cursor inválido: {cursor}'
+        )
+    return sort_value, pk_value
+
+
+async def _fetch(
+    db_session: AsyncSession,
+    query: Select,
+    options: LoadingProfile,
+    projection: Optional[Projection]
+) -> Sequence[Any]:
+    if projection:
+        return (await db_session.execute(projection.apply(query))).all()
+    return (await db_session.execute(query.options(*options))).scalars().all()
+
+
+async def paginate(
+    db_session: AsyncSession,
+    query: Select,
+    params: Params,
+    cursor: CursorParams,
+    *,
+    sort_column: InstrumentedAttribute,
+    pk_column: InstrumentedAttribute,
+    descending: bool = False,
+    options: LoadingProfile = (),
+    total: TotalMode = 'exact',
+    rank: Optional[ColumnElement] = None,
+    projection: Optional[Projection] = None,
+    known_total: Optional[int] = None,
+) -> Union[Page[Any], CursorPage[Any]]:
+    """Pagina `query` com ordenação estável por (sort_column, pk_column).
+
+    No modo `page` calcula o total conforme `total` e usa OFFSET/LIMIT; no modo
+    cursor busca `size + 1` linhas a partir da chave do cursor, sem OFFSET, de modo
+    que o custo de qualquer página é o mesmo da primeira. Um `rank` (relevância da
+    busca) tem precedência na ordenação e só é suportado no modo `page`.
+
+    Com `projection`, os itens são dicionários montados das linhas (ver
+    `Projection`) em vez de objetos ORM carregados com `options`. `known_total`
+    é um COUNT exato já feito pelo chamador (ex.: `list_etag`), usado com `total=exact`.
+    """
+    same_column = sort_column.key == pk_column.key
+    if descending:
+        order_by = (sort_column.desc(),) if same_column else (sort_column.desc(), pk_column.desc())
+    else:
+        order_by = (sort_column,) if same_column else (sort_column, pk_column)
+
+    if rank is not None:
+        if cursor.enabled:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='A busca por relevância não suporta paginação por cursor.'
+            )
+        order_by = (rank.desc(), *order_by)
+
+    if not cursor.enabled:
+        if total == 'exact' and known_total is not None:
+            total_count = known_total
+        else:
+            total_count = await count_total(db_session, query, total)
+
+        offset = (params.page - 1) * params.size
+        items = await _fetch(
+            db_session, query.order_by(*order_by).offset(offset).limit(params.size), options, projection
+        )
+        if projection:
+            items = [projection.build(row) for row in items]
+
+        return Page.create(items=items, total=total_count, params=params)
+
+    if cursor.after:
+        sort_value, pk_value = decode_cursor(cursor.after, sort_column, descending)
+        if same_column:
+            chave, valor = sort_column, sort_value
+        else:
+            chave, valor = tuple_(sort_column, pk_column), tuple_(sort_value, pk_value)
+        query = query.filter(chave < valor if descending else chave > valor)
+
+    items = await _fetch(db_session, query.order_by(*order_by).limit(params.size + 1), options, projection)
+
+    next_cursor = None
+    if len(items) > params.size:
+        items = items[:params.size]
+        ultimo = items[-1]
+        next_cursor = encode_cursor(
+            sort_column,
+            getattr(ultimo, sort_column.key),
+            getattr(ultimo, pk_column.key),
+            descending,
+        )
+
+    if projection:
+        items = [projection.build(row) for row in items]
+
+    return CursorPage(items=items, size=params.size, next_cursor=next_cursor)
+
@@ -0,0 +1,43 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.database import PRIMARY_COOKIE, RequestWrites, request_writes
+from workout_api.configs.settings import settings
+
+
+class ReadYourWritesMiddleware:
+    """Depois de uma requisição que fez commit no primário, envia o cookie
+    `workout_primary_until` com validade de `DB_READ_YOUR_WRITES_WINDOW` segundos.
+
+    Enquanto ele vale, `get_read_session` usa o primário para as leituras desse
+    cliente, que assim vê o que acabou de gravar mesmo com atraso nas réplicas.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        writes = RequestWrites()
+        token = request_writes.set(writes)
+
+        async def send_with_cookie(message: Message) -> None:
+            if message['type'] == 'http.response.start' and writes.committed:
+                janela = settings.DB_READ_YOUR_WRITES_WINDOW
+                MutableHeaders(scope=message).append(
+                    'Set-Cookie',
+                    f'{PRIMARY_COOKIE}={time.time() + janela:.3f}; Max-Age={math.ceil(janela)}; '
+                    'Path=/; HttpOnly; SameSite=Lax'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            request_writes.reset(token)
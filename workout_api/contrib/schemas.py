@@ -1,5 +1,6 @@
 from typing import Annotated
-from pydantic import UUID4, BaseModel, Field
+from uuid import UUID
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -10,5 +11,5 @@ class BaseSchema(BaseModel):
 
 
 class OutMixin(BaseSchema):
-    id: Annotated[UUID4, Field(description='Identificador')]
+    id: Annotated[UUID, Field(description='Identificador (UUIDv7 nos registros novos)')]
     created_at: Annotated[datetime, Field(description='Data de criação')]         
\ No newline at end of file
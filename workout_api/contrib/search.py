@@ -0,0 +1,45 @@
+from typing import Annotated, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import ColumnElement, func, literal
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+MIN_SEARCH_LENGTH = 3
+
+SearchQuery = Annotated[
+    Optional[str],
+    Query(
+        description=f'Busca aproximada por nome (trigramas, sem acentos), '
+                    f'mínimo de {MIN_SEARCH_LENGTH} caracteres'
+    )
+]
+
+
+def normalized(valor) -> ColumnElement:
+    """Mesma expressão dos índices `ix_<tabela>_nome_trgm`: sem acentos e em minúsculas."""
+    return func.immutable_unaccent(func.lower(valor))
+
+
+def apply_search(
+    query: Select,
+    column: InstrumentedAttribute,
+    termo: str
+) -> Tuple[Select, ColumnElement]:
+    """Filtra `query` por similaridade de palavras com `termo`.
+
+    Retorna a query filtrada e a expressão de ranking (`word_similarity`) para
+    ordenar os resultados do mais para o menos parecido.
+    """
+    termo = termo.strip()
+    if len(termo) < MIN_SEARCH_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'A busca precisa de pelo menos {MIN_SEARCH_LENGTH} caracteres.'
+        )
+
+    alvo = normalized(column)
+    termo_normalizado = normalized(literal(termo))
+    # `<%` é o operador de word similarity do pg_trgm, indexável pelo GIN
+    query = query.filter(termo_normalizado.op('<%')(alvo))
+    return query, func.word_similarity(termo_normalizado, alvo)
@@ -0,0 +1,131 @@
+from typing import Annotated, Any, Callable, Collection, Dict, List, Optional, Sequence, Tuple, Type, Union
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel as PydanticModel
+from sqlalchemy import Row, inspect
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import Label
+
+from workout_api.contrib.models import BaseModel
+from workout_api.contrib.repository import models  # noqa: F401 - registra todos os modelos
+
+Campo = Tuple[str, int, Any]
+
+FieldsQuery = Annotated[
+    Optional[str],
+    Query(description='Campos da resposta separados por vírgula (ex.: pk_id,nome,categoria); padrão: todos')
+]
+
+
+class Projection:
+    """Leitura de um schema de saída como tuplas, sem objetos ORM nem validação Pydantic.
+
+    Seleciona exatamente as colunas dos campos do schema (relacionamentos viram
+    JOIN e colunas com prefixo `relacao__`) e monta os dicionários de resposta
+    direto das linhas, prontos para `ORJSONResponse`. Assim como `loading_profile`,
+    falha na importação se o schema tiver campo que não é coluna nem relacionamento
+    muitos-para-um do modelo.
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        schema: Type[PydanticModel],
+        fields: Optional[Collection[str]] = None,
+        extra: Sequence[InstrumentedAttribute] = ()
+    ):
+        self.model = model
+        self.schema = schema
+        self.columns: List[Label] = []
+        self.joins: List[InstrumentedAttribute] = []
+        self.build = self._builder(self._campos(model, schema, '', fields))
+        nomes = {coluna.name for coluna in self.columns}
+        self.columns.extend(coluna.label(coluna.key) for coluna in extra if coluna.key not in nomes)
+        self._subsets: Dict[Any, 'Projection'] = {}
+
+    def only(self, fields: Collection[str], extra: Sequence[InstrumentedAttribute] = ()) -> 'Projection':
+        """Projeção restrita aos campos de primeiro nível pedidos em `?fields=`.
+
+        As colunas de `extra` (ex.: chaves do cursor) entram no SELECT, mas não na resposta.
+        """
+        chave = (frozenset(fields), tuple(coluna.key for coluna in extra))
+        if chave not in self._subsets:
+            self._subsets[chave] = Projection(self.model, self.schema, fields, extra)
+        return self._subsets[chave]
+
+    def _campos(
+        self,
+        model: Type[BaseModel],
+        schema: Type[PydanticModel],
+        prefixo: str,
+        fields: Optional[Collection[str]] = None
+    ) -> List[Campo]:
+        mapper = inspect(model)
+        campos: List[Campo] = []
+        for nome, field in schema.model_fields.items():
+            if fields is not None and nome not in fields:
+                continue
+            if nome in mapper.relationships:
+                relacao = mapper.relationships[nome]
+                if relacao.uselist:
+                    raise ValueError(f'{schema.__name__}.{nome} é uma coleção; use loading_profile')
+                self.joins.append(getattr(model, nome))
+                sub = self._campos(relacao.mapper.class_, field.annotation, f'{prefixo}{nome}__')
+                campos.append((nome, -1, self._builder(sub)))
+            elif nome in mapper.column_attrs:
+                campos.append((nome, len(self.columns), None))
+                self.columns.append(getattr(model, nome).label(f'{prefixo}{nome}'))
+            else:
+                raise ValueError(f'{schema.__name__}.{nome} não é coluna nem relacionamento de {model.__name__}')
+        return campos
+
+    @staticmethod
+    def _builder(campos: List[Campo]) -> Callable[[Row], Dict[str, Any]]:
+        def build(row: Row) -> Dict[str, Any]:
+            return {nome: row[i] if sub is None else sub(row) for nome, i, sub in campos}
+        return build
+
+    def apply(self, query: Select) -> Select:
+        """Troca as colunas de `query` (filtros e ordenação são mantidos) pelas do schema."""
+        query = query.with_only_columns(*self.columns)
+        for relacao in self.joins:
+            query = query.join(relacao)
+        return query
+
+
+def parse_fields(fields: str, schema: Type[PydanticModel]) -> List[str]:
+    campos = [campo.strip() for campo in fields.split(',') if campo.strip()]
+    invalidos = [campo for campo in campos if campo not in schema.model_fields]
+    if invalidos or not campos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos em fields: {', '.join(invalidos) or fields!r}. "
+                   f"Disponíveis: {', '.join(schema.model_fields)}"
+        )
+    return campos
+
+
+def _json_default(valor: Any) -> str:
+    # O asyncpg devolve asyncpg.pgproto.UUID, subclasse de uuid.UUID que o orjson não serializa
+    if isinstance(valor, UUID):
+        return str(valor)
+    raise TypeError(f'Valor não serializável: {valor!r}')
+
+
+class RowsResponse(ORJSONResponse):
+    """`ORJSONResponse` para dicionários montados direto das linhas do banco (ver `Projection`)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def orjson_page(page: Union[PydanticModel, Dict[str, Any]], **extra: Any) -> RowsResponse:
+    """Resposta de uma página cujos itens já são dicionários, sem passar pelo `response_model`.
+
+    `extra` acrescenta chaves ao lado de `items` (ex.: tabelas de referência da página normalizada).
+    """
+    return RowsResponse({**dict(page), **extra})
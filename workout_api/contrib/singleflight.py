@@ -0,0 +1,47 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+def _consumir(futuro: asyncio.Future) -> None:
+    # Evita o aviso "exception was never retrieved" quando ninguém esperava o líder
+    if not futuro.cancelled():
+        futuro.exception()
+
+
+class SingleFlight(Generic[T]):
+    """Executa uma única vez as chamadas concorrentes com a mesma chave.
+
+    A primeira chamada (líder) executa `fn`; as que chegam enquanto ela está em
+    andamento aguardam e recebem o mesmo resultado (ou a mesma exceção). Nada é
+    guardado depois que o líder termina.
+    """
+
+    def __init__(self) -> None:
+        self._em_andamento: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Devolve o resultado e se ele veio de outra chamada em andamento."""
+        futuro = self._em_andamento.get(key)
+        if futuro is not None:
+            self.shared += 1
+            return await asyncio.shield(futuro), True
+
+        futuro = asyncio.get_running_loop().create_future()
+        futuro.add_done_callback(_consumir)
+        self._em_andamento[key] = futuro
+        try:
+            resultado = await fn()
+        except BaseException as exc:
+            futuro.set_exception(exc)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado, False
+        finally:
+            del self._em_andamento[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'in_flight': len(self._em_andamento), 'shared': self.shared}
@@ -1,13 +1,111 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi_pagination import add_pagination
-from workout_api.atleta.controller import router as atleta_router
-from workout_api.categorias.controller import router as categoria_router
-from workout_api.centro_treinamento.controller import router as centro_router
+from sqlalchemy import select
+from sqlalchemy.sql import Executable
+
+from workout_api.configs.database import Database, database
+from workout_api.configs.settings import Settings, settings
+from workout_api.contrib.coalescing import CoalescingMiddleware
+from workout_api.contrib.compression import CompressionMiddleware
+from workout_api.contrib.instrumentation import QueryInstrumentationMiddleware
+from workout_api.contrib.replicas import ReadYourWritesMiddleware
+
+
+# Leituras mais acessadas em picos de acesso, coalescidas, e as tabelas de que dependem
+COALESCED_READS = {
+    r'/categorias/': ('categorias',),
+    r'/categorias/\d+': ('categorias',),
+    r'/centros_treinamento/': ('centros_treinamento',),
+    r'/centros_treinamento/\d+': ('centros_treinamento',),
+    r'/atletas/\d+': ('atletas', 'categorias', 'centros_treinamento'),
+}
+# Prefixo das rotas de escrita e a tabela que elas alteram
+WRITE_PREFIXES = {
+    '/atletas': 'atletas',
+    '/categorias': 'categorias',
+    '/centros_treinamento': 'centros_treinamento',
+}
+
+
+def _include_routers(app: FastAPI) -> None:
+    # Importados só ao montar o app: importar workout_api (alembic, scripts) não carrega os controllers
+    from workout_api.atleta.controller import router as atleta_router
+    from workout_api.categorias.controller import router as categoria_router
+    from workout_api.centro_treinamento.controller import router as centro_router
+    from workout_api.metrics.controller import router as metrics_router
+
+    app.include_router(atleta_router, prefix='/atletas', tags=['Atletas'])
+    app.include_router(categoria_router, prefix='/categorias', tags=['Categorias'])
+    app.include_router(centro_router, prefix='/centros_treinamento', tags=['Centros de Treinamento'])
+    app.include_router(metrics_router, tags=['Métricas'])
+
+
+def _hot_statements() -> List[Executable]:
+    """Comandos preparados em cada conexão no aquecimento: o mesmo SQL que os
+    endpoints mais chamados geram, com parâmetros que não encontram linhas."""
+    from workout_api.atleta.controller import ATLETA_OUT, ATLETA_ROWS
+    from workout_api.atleta.models import AtletaModel
+    from workout_api.atleta.stats import stats_query
+    from workout_api.categorias.models import CategoriaModel
+    from workout_api.centro_treinamento.models import CentroTreinamentoModel
+
+    return [
+        select(AtletaModel).options(*ATLETA_OUT).filter_by(pk_id=0),
+        ATLETA_ROWS.apply(select(AtletaModel).order_by(AtletaModel.pk_id).offset(0).limit(0)),
+        select(CategoriaModel).filter_by(pk_id=0),
+        select(CentroTreinamentoModel).filter_by(pk_id=0),
+        stats_query('total'),
+    ]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    from workout_api.atleta.stats import stats_refresher
+    from workout_api.contrib.cache import cache_listener
+    from workout_api.contrib.idempotency import idempotency_janitor
+
+    db: Database = app.state.database
+    if db.config.DB_POOL_WARMUP:
+        await db.warm(_hot_statements())
+    await cache_listener.start(db.config.DATABASE_URL)
+    await stats_refresher.start(db)
+    await idempotency_janitor.start(db)
+    try:
+        yield
+    finally:
+        await idempotency_janitor.stop()
+        await stats_refresher.stop()
+        await cache_listener.stop()
+        await db.dispose()
+
+
+def create_app(config: Settings = settings) -> FastAPI:
+    """Monta o app: rotas, paginação, instrumentação e o ciclo de vida do pool.
 
-app = FastAPI(title='Workout API')
+    Primário e réplicas de `config` ficam em `app.state.database`, usado pelas
+    sessões das requisições, pelas métricas e pelas tarefas de fundo do
+    lifespan. Com as configurações do ambiente, é o `database` compartilhado com
+    os scripts e benchmarks, que instrumentam os mesmos engines. Os caches de
+    categorias e centros e a coalescência continuam sendo do processo: dois apps
+    de bancos diferentes no mesmo processo dividiriam esses itens.
+    """
+    app = FastAPI(title='Workout API', default_response_class=ORJSONResponse, lifespan=lifespan)
+    app.state.database = database if config is settings else Database(config)
+    # A compressão fica dentro da instrumentação, para o tempo de app incluir a codificação,
+    # e da coalescência, para as requisições coalescidas compartilharem o corpo já comprimido
+    app.add_middleware(CompressionMiddleware)
+    if config.COALESCE_ENABLED:
+        app.add_middleware(CoalescingMiddleware, reads=COALESCED_READS, writes=WRITE_PREFIXES)
+    if config.replica_urls:
+        app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(QueryInstrumentationMiddleware)
+    _include_routers(app)
+    add_pagination(app)
+    return app
 
-app.include_router(atleta_router, prefix='/atletas', tags=['Atletas'])
-app.include_router(categoria_router, prefix='/categorias', tags=['Categorias'])
-app.include_router(centro_router, prefix='/centros_treinamento', tags=['Centros de Treinamento'])
 
-add_pagination(app)
+app = create_app()
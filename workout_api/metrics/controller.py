@@ -0,0 +1,53 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import PlainTextResponse
+
+from workout_api.configs.database import Database
+from workout_api.contrib.cache import cache_stats
+from workout_api.contrib.coalescing import request_coalescer
+from workout_api.contrib.instrumentation import request_metrics
+
+router = APIRouter()
+
+
+@router.get(
+    '/metrics',
+    summary='Métricas de requisições, SQL e pool no formato do Prometheus',
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse
+)
+async def get_metrics(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(request_metrics.render(request.app.state.database), media_type='text/plain; version=0.0.4')
+
+
+@router.get(
+    '/metrics/pool',
+    summary='Estado do pool de conexões com o banco e das réplicas de leitura',
+    status_code=status.HTTP_200_OK
+)
+async def get_pool_metrics(request: Request) -> Dict[str, Any]:
+    database: Database = request.app.state.database
+    return {
+        **database.pool_status(),
+        'primary_reads': database.replica_router.primary_reads,
+        'replicas': database.replica_router.status()
+    }
+
+
+@router.get(
+    '/metrics/cache',
+    summary='Acertos e falhas dos caches de categorias e centros de treinamento',
+    status_code=status.HTTP_200_OK
+)
+async def get_cache_metrics() -> Dict[str, Dict[str, int]]:
+    return cache_stats()
+
+
+@router.get(
+    '/metrics/coalescing',
+    summary='Requisições executadas, compartilhadas e repetidas pela coalescência de leituras',
+    status_code=status.HTTP_200_OK
+)
+async def get_coalescing_metrics() -> Dict[str, Any]:
+    return request_coalescer.stats()
@@ -0,0 +1,71 @@
+"""Servidor de produção: `python -m workout_api.serve`.
+
+Sobe o uvicorn com os workers, event loop, parser HTTP e limites de `SERVER_*`.
+Com `DB_MAX_CONNECTIONS`, o pool de cada worker é reduzido para que a soma das
+conexões de todos os workers (pool, overflow e a conexão do LISTEN do cache)
+caiba no limite. No SIGTERM o uvicorn para de aceitar conexões, espera as
+requisições em andamento por até `SERVER_GRACEFUL_TIMEOUT` segundos e roda o
+encerramento do lifespan, que fecha o pool.
+"""
+import logging
+import os
+from typing import Tuple
+
+import uvicorn
+from sqlalchemy.engine import make_url
+
+from workout_api.configs.settings import Settings, settings
+
+logger = logging.getLogger('workout_api.serve')
+
+
+def worker_count(config: Settings) -> int:
+    return config.SERVER_WORKERS or os.cpu_count() or 1
+
+
+def worker_pool(config: Settings, workers: int) -> Tuple[int, int]:
+    """`(pool_size, max_overflow)` de cada worker dentro de `DB_MAX_CONNECTIONS`."""
+    if not config.DB_MAX_CONNECTIONS:
+        return config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW
+
+    listener = 1 if make_url(config.DATABASE_URL).drivername.startswith('postgresql') else 0
+    por_worker = config.DB_MAX_CONNECTIONS // workers - listener
+    if por_worker < 1:
+        raise SystemExit(
+            f'DB_MAX_CONNECTIONS={config.DB_MAX_CONNECTIONS} não comporta {workers} workers; '
+            'reduza SERVER_WORKERS ou aumente o limite'
+        )
+    pool_size = min(config.DB_POOL_SIZE, por_worker)
+    return pool_size, min(config.DB_MAX_OVERFLOW, por_worker - pool_size)
+
+
+def main(config: Settings = settings) -> None:
+    workers = worker_count(config)
+    pool_size, max_overflow = worker_pool(config, workers)
+    # Os workers são processos novos que leem as configurações do ambiente
+    os.environ['DB_POOL_SIZE'] = str(pool_size)
+    os.environ['DB_MAX_OVERFLOW'] = str(max_overflow)
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        '%d workers, pool de %d conexões (+%d de overflow) por worker',
+        workers, pool_size, max_overflow
+    )
+    uvicorn.run(
+        'workout_api.main:app',
+        host=config.SERVER_HOST,
+        port=config.SERVER_PORT,
+        workers=workers,
+        loop=config.SERVER_LOOP,
+        http=config.SERVER_HTTP,
+        backlog=config.SERVER_BACKLOG,
+        timeout_keep_alive=config.SERVER_KEEPALIVE,
+        limit_concurrency=config.SERVER_LIMIT_CONCURRENCY or None,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_TIMEOUT,
+        access_log=config.SERVER_ACCESS_LOG,
+        lifespan='on',
+    )
+
+
+if __name__ == '__main__':
+    main()